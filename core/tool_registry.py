@@ -224,6 +224,9 @@ class ToolRegistry:
         """
         self.plugin_manager = plugin_manager
         self.tools: Dict[str, Tool] = {}
+        # Bumped whenever update_domain_from_data changes a domain in place, so
+        # results memoized against the old domains can be told apart
+        self.domain_version = 0
         self.rebuild_registry()
     
     def rebuild_registry(self) -> None:
@@ -358,6 +361,7 @@ class ToolRegistry:
                         # Update the domain values in the ToolRegistry's copy
                         if domain_update.get("type") == "numeric_range":
                             arg.domain.values = domain_update.get("values")
+                            self.domain_version += 1
                         
                         # Also update the domain values in the plugin's internal tool definitions
                         plugin = self.plugin_manager.get_plugin_for_tool(tool_name)
@@ -26,7 +26,7 @@ from llm.provider import LLMProvider
 from llm.ollama import OllamaProvider
 from llm.simulation import UserSimulator
 
-from simulation.evaluation import SimulationEvaluator, SimulationVisualizer
+from simulation.evaluation import SimulationEvaluator, SimulationVisualizer, LazyStr
 from simulation.data_loader import SimulationDataLoader
 
 from utils.logger import setup_logger
@@ -311,6 +311,12 @@ def run_simulation(
             print("EVALUATION:")
             print(visualizer.visualize_metrics(result["evaluation"]))
         print("\n" + "="*80)
+    elif "evaluation" in result:
+        # Only rendered if a handler actually emits the debug record
+        logger.debug(
+            "Evaluation metrics:\n%s",
+            LazyStr(SimulationVisualizer().visualize_metrics, result["evaluation"])
+        )
     
     return result
 
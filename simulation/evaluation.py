@@ -1,17 +1,126 @@
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, TextIO, Callable
+from collections import OrderedDict
+from dataclasses import dataclass
+import copy
+import io
 import logging
+import sys
+
+from utils.json_utils import hashable_key
 
 logger = logging.getLogger(__name__)
 
+# Sentinel for parameters missing from a tool call (None is a valid value)
+_MISSING = object()
+
+# Shared read-only default for .get() lookups; must never be mutated
+_EMPTY: Dict[str, Any] = {}
+
+# Interned role/type constants; str == short-circuits on identity, so turns
+# built from these (or from interned input) skip the character comparison
+_USER = sys.intern("user")
+_AGENT = sys.intern("agent")
+_CLARIFICATION = sys.intern("clarification")
+_FOLLOW_UP = sys.intern("follow_up")
+
+# Automated turn types that do not count towards conversation metrics
+_EXCLUDED_TURN_TYPES = frozenset({
+    "execution", "execution_result", "confirmation", "execution_retry", "execution_error"
+})
 
+# Display prefixes for user turns, keyed by turn type
+_USER_TURN_PREFIXES = {
+    "initial": "User (initial)",
+    "follow_up": "User (follow-up)",
+    "clarification_response": "User (clarification)"
+}
+
+
+@dataclass
+class ConversationIndex:
+    """Turn counts and rendered lines for a conversation, built in a single pass."""
+    total_turns: int = 0
+    user_turns: int = 0
+    agent_turns: int = 0
+    clarification_turns: int = 0
+    follow_up_turns: int = 0
+    rendered: Optional[List[str]] = None
+    
+    @classmethod
+    def build(
+        cls,
+        conversation: List[Dict[str, Any]],
+        render: bool = True
+    ) -> "ConversationIndex":
+        """
+        Index a conversation so metrics and visualization can share one pass.
+        
+        Args:
+            conversation: List of conversation turns
+            render: Whether to also format each turn for display
+            
+        Returns:
+            Conversation index
+        """
+        index = cls(rendered=[] if render else None)
+        append = index.rendered.append if render else None
+        
+        for turn in conversation:
+            role = turn.get("role")
+            turn_type = turn.get("type")
+            
+            if render:
+                if role == _USER:
+                    prefix = _USER_TURN_PREFIXES.get(turn_type, "User")
+                elif role == _AGENT:
+                    prefix = f"Agent ({turn_type})" if turn_type else "Agent"
+                else:
+                    prefix = turn.get("role", "unknown")
+                append(f"{prefix}: {turn.get('message', '')}")
+            
+            # Only count human-relevant turns - exclude execution and confirmation messages
+            if turn_type in _EXCLUDED_TURN_TYPES:
+                continue
+            
+            index.total_turns += 1
+            
+            if role == _USER:
+                index.user_turns += 1
+                if turn_type == _FOLLOW_UP:
+                    index.follow_up_turns += 1
+            elif role == _AGENT:
+                # Count agent turns (excluding automated)
+                index.agent_turns += 1
+                if turn_type == _CLARIFICATION:
+                    index.clarification_turns += 1
+        
+        return index
+    
+    def to_metrics(self) -> Dict[str, Any]:
+        """Convert the turn counts to the conversation metrics dictionary."""
+        return {
+            "total_turns": self.total_turns,
+            "user_turns": self.user_turns,
+            "agent_turns": self.agent_turns,
+            "clarification_questions": self.clarification_turns,
+            "follow_up_requests": self.follow_up_turns
+        }
 
 
 class SimulationEvaluator:
     """Class for evaluating simulation results."""
     
-    def __init__(self):
-        """Initialize a simulation evaluator."""
-        pass
+    def __init__(self, cache_size: int = 0):
+        """
+        Initialize a simulation evaluator.
+        
+        Args:
+            cache_size: Maximum number of evaluations to memoize by content
+                (0 disables caching). Useful when re-evaluating the same
+                simulation outputs repeatedly.
+        """
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
 
     def _extract_final_planned_calls(self, attempts: List[Dict]) -> List[Dict]:
         """Extract the final planned state of each unique tool call."""
@@ -20,7 +129,7 @@ class SimulationEvaluator:
         for attempt in attempts:
             tool_call = attempt.get("tool_call", {})
             tool_name = tool_call.get("tool_name", "")
-            arguments = tool_call.get("arguments", {})
+            arguments = tool_call.get("arguments", _EMPTY)
             
             # Create a signature based on tool name and arguments structure
             # We use argument keys to identify the "same" tool call across attempts
@@ -32,6 +141,13 @@ class SimulationEvaluator:
             tool_call_map[signature] = tool_call
         
         return list(tool_call_map.values())
+
+    def _index_by_tool_name(self, tool_calls: List[Dict]) -> Dict[str, Dict]:
+        """Map each tool name to its first tool call, mirroring a first-match linear scan."""
+        index = {}
+        for tc in tool_calls:
+            index.setdefault(tc.get("tool_name"), tc)
+        return index
     
     # def _extract_final_planned_calls(self, attempts: List[Dict]) -> List[Dict]:
     #     """
@@ -149,18 +265,11 @@ class SimulationEvaluator:
         Returns:
             Evaluation metrics
         """
-        metrics = {}
-        
         # Extract ground truth
+        # Turn information is not read by any of the metric calculations below,
+        # so the ground truth is used as-is without backfilling a default turn
         ground_truth = simulation_data.get("ground_truth_tool_calls", [])
-        
-        # Check if ground truth has turn information
-        has_turn_info = any("turn" in tc for tc in ground_truth)
-        
-        # For backward compatibility, if no turn info is present, assume all are from turn 1
-        if not has_turn_info:
-            ground_truth = [{"turn": 1, **tc} for tc in ground_truth]
-        
+
         # Extract data from tool call attempts - THIS IS THE ONLY SOURCE
         all_tool_call_attempts = simulation_result.get("all_tool_call_attempts", [])
         
@@ -169,20 +278,43 @@ class SimulationEvaluator:
         questions = simulation_result.get("questions", [])
         all_candidate_questions = simulation_result.get("all_candidate_questions", [])
         
+        # Serve repeated evaluations of identical inputs from the cache
+        cache_key = None
+        if self.cache_size > 0:
+            try:
+                cache_key = hashable_key(
+                    (ground_truth, all_tool_call_attempts, conversation, questions, all_candidate_questions)
+                )
+                cached = self._cache.get(cache_key)
+            except TypeError:
+                # Inputs that aren't plain JSON-like data are evaluated uncached
+                cache_key = cached = None
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return copy.deepcopy(cached)
+        
         # Calculate ALL metrics directly from attempts
         attempt_metrics = self._calculate_attempt_based_metrics(all_tool_call_attempts, ground_truth)
         conversation_metrics = self._calculate_conversation_metrics(conversation)
         question_metrics = self._calculate_question_metrics(questions, all_candidate_questions)
         
         # Combine all metrics
-        metrics.update(attempt_metrics)
-        metrics["conversation"] = conversation_metrics
-        metrics["questions"] = question_metrics
-        metrics["num_questions"] = len(questions)
-        metrics["num_candidate_questions"] = len(all_candidate_questions)
-        metrics["num_tool_call_attempts"] = len(all_tool_call_attempts)
+        metrics = {
+            **attempt_metrics,
+            "conversation": conversation_metrics,
+            "questions": question_metrics,
+            "num_questions": len(questions),
+            "num_candidate_questions": len(all_candidate_questions),
+            "num_tool_call_attempts": len(all_tool_call_attempts)
+        }
+        
+        if cache_key is not None:
+            self._cache[cache_key] = copy.deepcopy(metrics)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
         
         return metrics
+
     def _calculate_validity_metrics(
         self,
         final_tool_calls: List[Dict[str, Any]]
@@ -203,16 +335,12 @@ class SimulationEvaluator:
         
         for tc in final_tool_calls:
             # Check if tool has all required parameters (not <UNK>)
-            is_valid = True
-            arguments = tc.get("arguments", tc.get("parameters", {}))
+            arguments = tc.get("arguments")
+            if arguments is None:
+                arguments = tc.get("parameters", _EMPTY)
             
             # For this simulation, we consider a tool call valid if it doesn't have <UNK> values
-            for param, value in arguments.items():
-                if value == "<UNK>":
-                    is_valid = False
-                    break
-            
-            if is_valid:
+            if "<UNK>" not in arguments.values():
                 valid_count += 1
         
         metrics["total_tool_calls"] = total_count
@@ -241,155 +369,96 @@ class SimulationEvaluator:
             return {
                 "exact_match": False,
                 "tool_match_rate": 0.0,
-                "param_match_rate": 0.0,
-                "tools_fully_matched_rate": 0.0
+                "param_match_rate": 0.0
             }
             
-        # Create sets of tool names for comparison
+        # Index final tool calls by name once for tool, parameter and exact matching
+        final_by_name = self._index_by_tool_name(final_tool_calls)
+        
+        # Create set of ground truth tool names for comparison
         gt_tool_names = {tc.get("tool_name") for tc in ground_truth}
-        actual_tool_names = {tc.get("tool_name") for tc in final_tool_calls}
         
         # Calculate tool match rate
         if not gt_tool_names:
             tool_match_rate = 0.0
         else:
-            # Calculate intersection
-            matching_tools = gt_tool_names.intersection(actual_tool_names)
+            # Intersect with the index's key view rather than building a second set
+            matching_tools = final_by_name.keys() & gt_tool_names
             tool_match_rate = len(matching_tools) / len(gt_tool_names)
         
-        # Calculate parameter match rate
+        # Calculate parameter match rate, checking for an exact match in the same pass.
+        # An exact match needs a one-to-one pairing with identical parameter keys and
+        # strictly equal values (no single-element list leniency).
         total_params = 0
         matching_params = 0
+        exact_match = len(ground_truth) == len(final_tool_calls)
         
         for gt_tc in ground_truth:
-            gt_tool_name = gt_tc.get("tool_name")
-            gt_params = gt_tc.get("parameters", {})
+            gt_params = gt_tc.get("parameters", _EMPTY)
             
             # Find matching tool call
-            matching_tc = None
-            for tc in final_tool_calls:
-                if tc.get("tool_name") == gt_tool_name:
-                    matching_tc = tc
-                    break
-            
-            if matching_tc:
-                actual_params = matching_tc.get("arguments", matching_tc.get("parameters", {}))
+            matching_tc = final_by_name.get(gt_tc.get("tool_name"))
+            
+            if not matching_tc:
+                exact_match = False
+                continue
+            
+            actual_params = matching_tc.get("arguments", matching_tc.get("parameters", _EMPTY))
+            # Exact matching prefers "parameters" when a call carries both keys
+            if "arguments" in matching_tc and "parameters" in matching_tc:
+                strict_params = matching_tc["parameters"]
+            else:
+                strict_params = actual_params
+            
+            # Check for missing or extra parameters (key views compare without building sets)
+            if exact_match and gt_params.keys() != strict_params.keys():
+                exact_match = False
+            
+            # Count parameters
+            for param_name, gt_value in gt_params.items():
+                total_params += 1
                 
-                # Count parameters
-                for param_name, gt_value in gt_params.items():
-                    total_params += 1
-                    
-                    if param_name in actual_params:
-                        actual_val = actual_params[param_name]
-                        
-                        # Check for direct equality first
-                        if actual_val == gt_value:
-                            # Direct match
-                            matching_params += 1
-                        # Check if one is a single-element list containing the other
-                        elif (isinstance(actual_val, list) and len(actual_val) == 1 and actual_val[0] == gt_value) or \
-                            (isinstance(gt_value, list) and len(gt_value) == 1 and gt_value[0] == actual_val):
-                            # Single-element list matches the other value
-                            matching_params += 1
-
+                actual_val = actual_params.get(param_name, _MISSING)
+                if actual_val is not _MISSING:
+                    # Check for direct equality first
+                    if actual_val == gt_value:
+                        # Direct match
+                        matching_params += 1
+                    # Check if one is a single-element list containing the other
+                    elif (isinstance(actual_val, list) and len(actual_val) == 1 and actual_val[0] == gt_value) or \
+                        (isinstance(gt_value, list) and len(gt_value) == 1 and gt_value[0] == actual_val):
+                        # Single-element list matches the other value
+                        matching_params += 1
+                
+                if exact_match and strict_params.get(param_name, _MISSING) != gt_value:
+                    exact_match = False
         
         param_match_rate = matching_params / total_params if total_params > 0 else 0.0
         
-
-        # Check for exact match of tool calls (success)
-        exact_match = self._check_exact_match(ground_truth, final_tool_calls)
-        
         return {
             "exact_match": exact_match,
             "tool_match_rate": tool_match_rate,
-            "param_match_rate": param_match_rate,
-            "tools_fully_matched_rate": 1.0 if tool_match_rate == 1.0 else 0.0
+            "param_match_rate": param_match_rate
         }
-
-    def _check_exact_match(
-        self,
-        ground_truth: List[Dict[str, Any]],
-        final_tool_calls: List[Dict[str, Any]]
-    ) -> bool:
-        """Check if there's an exact match between ground truth and final tool calls."""
-        if len(ground_truth) != len(final_tool_calls):
-            return False
-            
-        # Check each tool call
-        for gt_tc in ground_truth:
-            gt_tool_name = gt_tc.get("tool_name")
-            gt_params = gt_tc.get("parameters", {})
-            
-            # Find matching tool call
-            matching_tc = None
-            for tc in final_tool_calls:
-                if tc.get("tool_name") == gt_tool_name:
-                    matching_tc = tc
-                    break
-            
-            if not matching_tc:
-                return False
-                
-            # Compare parameters
-            actual_params = matching_tc.get("parameters", matching_tc.get("arguments", {}))
-            
-            # Check for missing or extra parameters
-            if set(gt_params.keys()) != set(actual_params.keys()):
-                return False
-                
-            # Check parameter values
-            for param_name, gt_value in gt_params.items():
-                if param_name not in actual_params or actual_params[param_name] != gt_value:
-                    return False
-        
-        return True
     
     def _calculate_conversation_metrics(
         self,
-        conversation: List[Dict[str, Any]]
+        conversation: List[Dict[str, Any]],
+        index: Optional[ConversationIndex] = None
     ) -> Dict[str, Any]:
         """
         Calculate metrics for the conversation - excluding automated messages.
         
         Args:
             conversation: List of conversation turns
+            index: Pre-built index of the same conversation, if available
             
         Returns:
             Conversation metrics
         """
-        metrics = {}
-        
-        # Only count human-relevant turns - exclude execution and confirmation messages
-        human_relevant_turns = []
-        for turn in conversation:
-            if turn.get("type") not in ["execution", "execution_result", "confirmation", "execution_retry", "execution_error"]:
-                human_relevant_turns.append(turn)
-        
-        metrics["total_turns"] = len(human_relevant_turns)
-        
-        # Count user turns
-        user_turns = [turn for turn in human_relevant_turns if turn.get("role") == "user"]
-        metrics["user_turns"] = len(user_turns)
-        
-        # Count agent turns (excluding automated)
-        agent_turns = [turn for turn in human_relevant_turns if turn.get("role") == "agent"]
-        metrics["agent_turns"] = len(agent_turns)
-        
-        # Count clarification questions
-        clarification_turns = [
-            turn for turn in human_relevant_turns 
-            if turn.get("role") == "agent" and turn.get("type") == "clarification"
-        ]
-        metrics["clarification_questions"] = len(clarification_turns)
-        
-        # Count follow-up requests
-        follow_up_turns = [
-            turn for turn in human_relevant_turns 
-            if turn.get("role") == "user" and turn.get("type") == "follow_up"
-        ]
-        metrics["follow_up_requests"] = len(follow_up_turns)
-        
-        return metrics
+        if index is None:
+            index = ConversationIndex.build(conversation, render=False)
+        return index.to_metrics()
     
     def _calculate_question_metrics(
         self,
@@ -417,23 +486,29 @@ class SimulationEvaluator:
                 "total_candidates": len(all_candidate_questions) if all_candidate_questions else 0
             }
         
-        # Count total questions
-        metrics["total"] = len(questions)
-        metrics["total_candidates"] = len(all_candidate_questions) if all_candidate_questions else len(questions)
-        
-        # Calculate average metrics
-        total_evpi = sum(q.get("metrics", {}).get("evpi", 0.0) for q in questions)
-        total_regret_reduction = sum(q.get("metrics", {}).get("regret_reduction", 0.0) for q in questions)
-        total_ucb_score = sum(q.get("metrics", {}).get("ucb_score", 0.0) for q in questions)
-        
-        metrics["average_evpi"] = total_evpi / len(questions) if questions else 0.0
-        metrics["average_regret_reduction"] = total_regret_reduction / len(questions) if questions else 0.0
-        metrics["average_ucb_score"] = total_ucb_score / len(questions) if questions else 0.0
+        # Count total questions (non-empty past the early return)
+        n = len(questions)
+        metrics["total"] = n
+        metrics["total_candidates"] = len(all_candidate_questions) if all_candidate_questions else n
+        
+        # Calculate average metrics in a single pass over the questions
+        total_evpi = 0.0
+        total_regret_reduction = 0.0
+        total_ucb_score = 0.0
+        for q in questions:
+            q_metrics = q.get("metrics") or _EMPTY
+            total_evpi += q_metrics.get("evpi", 0.0)
+            total_regret_reduction += q_metrics.get("regret_reduction", 0.0)
+            total_ucb_score += q_metrics.get("ucb_score", 0.0)
+        
+        metrics["average_evpi"] = total_evpi / n
+        metrics["average_regret_reduction"] = total_regret_reduction / n
+        metrics["average_ucb_score"] = total_ucb_score / n
         
         # If we have all candidate questions, calculate selection rate
         if all_candidate_questions:
             selected_count = sum(1 for q in all_candidate_questions if q.get("was_selected", False))
-            metrics["selection_rate"] = selected_count / len(all_candidate_questions) if all_candidate_questions else 0.0
+            metrics["selection_rate"] = selected_count / len(all_candidate_questions)
         
         return metrics
     
@@ -474,8 +549,8 @@ class SimulationEvaluator:
         valid_attempts = []
         
         for attempt in non_duplicate_attempts:
-            tool_call = attempt.get("tool_call", {})
-            arguments = tool_call.get("arguments", {})
+            tool_call = attempt.get("tool_call", _EMPTY)
+            arguments = tool_call.get("arguments", _EMPTY)
             
             # Check if any argument has <UNK>
             has_unk = any(value == "<UNK>" for value in arguments.values())
@@ -491,10 +566,12 @@ class SimulationEvaluator:
         
         # 3. CORRECTNESS METRICS - do the attempts match ground truth?
         # Compare successful attempts against ground truth
+        successful_by_name = self._index_by_tool_name(
+            [a.get("tool_call", {}) for a in successful_attempts]
+        )
         gt_tool_names = {tc.get("tool_name") for tc in ground_truth}
-        successful_tool_names = {a.get("tool_call", {}).get("tool_name") for a in successful_attempts}
         
-        matching_tools = gt_tool_names.intersection(successful_tool_names)
+        matching_tools = successful_by_name.keys() & gt_tool_names
         tool_match_rate = len(matching_tools) / len(gt_tool_names) if gt_tool_names else 0.0
         
         # Check parameter correctness for successful attempts
@@ -502,20 +579,18 @@ class SimulationEvaluator:
         matching_params = 0
         
         for gt_tc in ground_truth:
-            gt_tool_name = gt_tc.get("tool_name")
-            gt_params = gt_tc.get("parameters", {})
+            gt_params = gt_tc.get("parameters", _EMPTY)
             total_params += len(gt_params)
             
             # Find matching successful attempt
-            for attempt in successful_attempts:
-                tool_call = attempt.get("tool_call", {})
-                if tool_call.get("tool_name") == gt_tool_name:
-                    actual_params = tool_call.get("arguments", {})
-                    
-                    for param_name, gt_value in gt_params.items():
-                        if param_name in actual_params and actual_params[param_name] == gt_value:
-                            matching_params += 1
-                    break
+            tool_call = successful_by_name.get(gt_tc.get("tool_name"))
+            if tool_call is not None:
+                actual_params = tool_call.get("arguments", _EMPTY)
+                
+                for param_name, gt_value in gt_params.items():
+                    actual_val = actual_params.get(param_name, _MISSING)
+                    if actual_val is not _MISSING and actual_val == gt_value:
+                        matching_params += 1
         
         param_match_rate = matching_params / total_params if total_params > 0 else 0.0
         
@@ -545,7 +620,64 @@ class SimulationEvaluator:
             "correctness": correctness_metrics,
             "success": overall_success
         }
+
+
+class LazyStr:
+    """Defer building a string until it is formatted, e.g. by an emitted log record."""
+    
+    def __init__(self, fn: Callable[..., str], *args: Any, **kwargs: Any):
+        """
+        Initialize a lazy string.
         
+        Args:
+            fn: Function producing the string
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+        """
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+    
+    def __str__(self) -> str:
+        return self._fn(*self._args, **self._kwargs)
+
+
+class _LineWriter:
+    """Write lines to a text stream, separated the same way str.join would."""
+    
+    def __init__(self, out: Optional[TextIO] = None, sep: str = "\n"):
+        """
+        Initialize a line writer.
+        
+        Args:
+            out: Stream to write to (an in-memory buffer is used if omitted)
+            sep: Separator written between consecutive lines
+        """
+        self._out = out
+        self._buffer = out if out is not None else io.StringIO()
+        self._write = self._buffer.write
+        self._sep = sep
+        self._started = False
+    
+    def append(self, line: str) -> None:
+        """Write a line, preceded by the separator unless it is the first."""
+        if self._started:
+            self._write(self._sep)
+        else:
+            self._started = True
+        self._write(line)
+    
+    def blank(self) -> None:
+        """Write an empty line, separating what follows from the line before it."""
+        self.append("")
+    
+    def result(self) -> Optional[str]:
+        """Return the buffered text, or None when writing to a caller's stream."""
+        if self._out is not None:
+            return None
+        return self._buffer.getvalue()
+
+
 class SimulationVisualizer:
     """Class for visualizing simulation results."""
     
@@ -555,77 +687,75 @@ class SimulationVisualizer:
     
     def visualize_conversation(
         self,
-        conversation: List[Dict[str, Any]]
-    ) -> str:
+        conversation: List[Dict[str, Any]],
+        out: Optional[TextIO] = None,
+        index: Optional[ConversationIndex] = None
+    ) -> Optional[str]:
         """
         Visualize the conversation in a pretty format.
         
         Args:
             conversation: List of conversation turns
+            out: Optional stream to write to instead of returning a string
+            index: Pre-built index of the same conversation, if available
             
         Returns:
-            Formatted conversation string
+            Formatted conversation string, or None if written to out
         """
         if not conversation:
-            return "No conversation recorded."
-            
-        lines = []
-        
-        for i, turn in enumerate(conversation):
-            role = turn.get("role", "unknown")
-            message = turn.get("message", "")
-            turn_type = turn.get("type", "")
-            
-            if role == "user":
-                prefix = "User"
-                if turn_type == "initial":
-                    prefix = "User (initial)"
-                elif turn_type == "follow_up":
-                    prefix = "User (follow-up)"
-                elif turn_type == "clarification_response":
-                    prefix = "User (clarification)"
-                    
-                lines.append(f"\n{prefix}: {message}")
-                
-            elif role == "agent":
-                prefix = "Agent"
-                if turn_type:
-                    prefix = f"Agent ({turn_type})"
-                lines.append(f"\n{prefix}: {message}")
-                
-            else:
-                lines.append(f"\n{role}: {message}")
+            writer = _LineWriter(out)
+            writer.append("No conversation recorded.")
+            return writer.result()
+        
+        if index is None or index.rendered is None:
+            index = ConversationIndex.build(conversation)
+            
+        # Separate turns with a blank line
+        writer = _LineWriter(out, sep="\n\n")
+        append = writer.append
         
-        return "\n".join(lines)
+        for line in index.rendered:
+            append(line)
+        
+        return writer.result()
     
     def visualize_questions(
         self,
         questions: List[Dict[str, Any]],
-        all_candidate_questions: List[Dict[str, Any]] = None
-    ) -> str:
+        all_candidate_questions: List[Dict[str, Any]] = None,
+        out: Optional[TextIO] = None
+    ) -> Optional[str]:
         """
         Visualize the questions and their metrics.
         
         Args:
             questions: List of questions with metrics
             all_candidate_questions: List of all candidate questions
+            out: Optional stream to write to instead of returning a string
             
         Returns:
-            Formatted questions string
+            Formatted questions string, or None if written to out
         """
+        writer = _LineWriter(out)
+        append = writer.append
+        blank = writer.blank
+        
         if not questions and not all_candidate_questions:
-            return "No questions asked."
+            append("No questions asked.")
+            return writer.result()
             
-        lines = ["Questions and Metrics:"]
+        append("Questions and Metrics:")
         
         if all_candidate_questions:
-            lines.append(f"\nTotal candidate questions: {len(all_candidate_questions)}")
-            lines.append(f"Total selected questions: {len(questions)}")
-            lines.append(f"Selection rate: {len(questions)/len(all_candidate_questions):.2f} if all_candidate_questions else 'N/A'")
+            blank()
+            append(f"Total candidate questions: {len(all_candidate_questions)}")
+            append(f"Total selected questions: {len(questions)}")
+            append(f"Selection rate: {len(questions)/len(all_candidate_questions):.2f} if all_candidate_questions else 'N/A'")
             
             # Display selected questions
             if questions:
-                lines.append("\nSelected Questions:")
+                blank()
+                append("Selected Questions:")
                 for i, q in enumerate(questions):
                     question_text = q.get("question_text", "")
                     target_args = q.get("target_args", [])
@@ -639,9 +769,10 @@ class SimulationVisualizer:
                     regret_reduction = metrics.get("regret_reduction", 0.0)
                     ucb_score = metrics.get("ucb_score", 0.0)
                     
-                    lines.append(f"\nQuestion {i+1}: {question_text}")
-                    lines.append(f"Target Arguments: {target_args_str}")
-                    lines.append(f"Metrics: EVPI={evpi:.4f}, Regret Reduction={regret_reduction:.4f}, UCB Score={ucb_score:.4f}")
+                    blank()
+                    append(f"Question {i+1}: {question_text}")
+                    append(f"Target Arguments: {target_args_str}")
+                    append(f"Metrics: EVPI={evpi:.4f}, Regret Reduction={regret_reduction:.4f}, UCB Score={ucb_score:.4f}")
         else:
             # Legacy format with only selected questions
             for i, q in enumerate(questions):
@@ -657,18 +788,20 @@ class SimulationVisualizer:
                 regret_reduction = metrics.get("regret_reduction", 0.0)
                 ucb_score = metrics.get("ucb_score", 0.0)
                 
-                lines.append(f"\nQuestion {i+1}: {question_text}")
-                lines.append(f"Target Arguments: {target_args_str}")
-                lines.append(f"Metrics: EVPI={evpi:.4f}, Regret Reduction={regret_reduction:.4f}, UCB Score={ucb_score:.4f}")
+                blank()
+                append(f"Question {i+1}: {question_text}")
+                append(f"Target Arguments: {target_args_str}")
+                append(f"Metrics: EVPI={evpi:.4f}, Regret Reduction={regret_reduction:.4f}, UCB Score={ucb_score:.4f}")
         
-        return "\n".join(lines)
+        return writer.result()
     
     def visualize_tool_calls(
         self,
         tool_calls: List[Dict[str, Any]],
         title: str = "Tool Calls",
-        all_tool_call_attempts: List[Dict[str, Any]] = None
-    ) -> str:
+        all_tool_call_attempts: List[Dict[str, Any]] = None,
+        out: Optional[TextIO] = None
+    ) -> Optional[str]:
         """
         Visualize tool calls in a pretty format.
         
@@ -676,95 +809,113 @@ class SimulationVisualizer:
             tool_calls: List of tool calls
             title: Title for the visualization
             all_tool_call_attempts: List of all tool call attempts (successful and failed)
+            out: Optional stream to write to instead of returning a string
             
         Returns:
-            Formatted tool calls string
+            Formatted tool calls string, or None if written to out
         """
-        lines = []
+        writer = _LineWriter(out)
+        append = writer.append
+        blank = writer.blank
         
         if all_tool_call_attempts:
-            lines.append(f"All Tool Call Attempts: {len(all_tool_call_attempts)}")
+            append(f"All Tool Call Attempts: {len(all_tool_call_attempts)}")
             successful_attempts = sum(1 for a in all_tool_call_attempts if a.get("was_executed", False) and a.get("success", False))
-            lines.append(f"Successful Attempts: {successful_attempts}")
-            lines.append(f"Failed Attempts: {sum(1 for a in all_tool_call_attempts if a.get('was_executed', False) and not a.get('success', False))}")
-            lines.append(f"Skipped Attempts: {sum(1 for a in all_tool_call_attempts if not a.get('was_executed', False))}")
+            append(f"Successful Attempts: {successful_attempts}")
+            append(f"Failed Attempts: {sum(1 for a in all_tool_call_attempts if a.get('was_executed', False) and not a.get('success', False))}")
+            append(f"Skipped Attempts: {sum(1 for a in all_tool_call_attempts if not a.get('was_executed', False))}")
             
             # Add detailed visualization of attempts if desired
             # (omitted for brevity)
             
         if not tool_calls:
-            lines.append(f"\n{title}: None")
-            return "\n".join(lines)
+            blank()
+            append(f"{title}: None")
+            return writer.result()
             
-        lines.append(f"\n{title}:")
+        blank()
+        append(f"{title}:")
         
         for i, tc in enumerate(tool_calls):
             tool_name = tc.get("tool_name", "")
             arguments = tc.get("arguments", tc.get("parameters", {}))
             
             # Format parameters
-            params_str = ", ".join([f"{k}={v}" for k, v in arguments.items()])
+            params_str = ", ".join(["%s=%s" % kv for kv in arguments.items()])
             
-            lines.append(f"\n{i+1}. {tool_name}({params_str})")
+            blank()
+            append(f"{i+1}. {tool_name}({params_str})")
         
-        return "\n".join(lines)
+        return writer.result()
     
     def visualize_metrics(
         self,
-        metrics: Dict[str, Any]
-    ) -> str:
+        metrics: Dict[str, Any],
+        out: Optional[TextIO] = None
+    ) -> Optional[str]:
         """
         Visualize evaluation metrics in a pretty format.
         
         Args:
             metrics: Evaluation metrics
+            out: Optional stream to write to instead of returning a string
             
         Returns:
-            Formatted metrics string
+            Formatted metrics string, or None if written to out
         """
         validity = metrics.get("validity", {})
         correctness = metrics.get("correctness", {})
         conversation = metrics.get("conversation", {})
         questions = metrics.get("questions", {})
+        questions_get = questions.get
         
-        lines = ["Evaluation Metrics:"]
+        writer = _LineWriter(out)
+        append = writer.append
+        blank = writer.blank
+        append("Evaluation Metrics:")
         
         # Validity metrics
-        lines.append("\nValidity Metrics:")
-        lines.append(f"- Total Tool Calls: {validity.get('total_tool_calls', 0)}")
-        lines.append(f"- Valid Tool Calls: {validity.get('valid_tool_calls', 0)}")
-        lines.append(f"- Validity Rate: {validity.get('validity_rate', 0.0):.2f}")
-        lines.append(f"- All Valid: {'Yes' if validity.get('all_valid', False) else 'No'}")
+        blank()
+        append("Validity Metrics:")
+        append(f"- Total Tool Calls: {validity.get('total_tool_calls', 0)}")
+        append(f"- Valid Tool Calls: {validity.get('valid_tool_calls', 0)}")
+        append(f"- Validity Rate: {validity.get('validity_rate', 0.0):.2f}")
+        append(f"- All Valid: {'Yes' if validity.get('all_valid', False) else 'No'}")
         
         # Correctness metrics
-        lines.append("\nCorrectness Metrics:")
-        lines.append(f"- Exact Match: {'Yes' if correctness.get('exact_match', False) else 'No'}")
-        lines.append(f"- Tool Match Rate: {correctness.get('tool_match_rate', 0.0):.2f}")
-        lines.append(f"- Parameter Match Rate: {correctness.get('param_match_rate', 0.0):.2f}")
+        blank()
+        append("Correctness Metrics:")
+        append(f"- Exact Match: {'Yes' if correctness.get('exact_match', False) else 'No'}")
+        append(f"- Tool Match Rate: {correctness.get('tool_match_rate', 0.0):.2f}")
+        append(f"- Parameter Match Rate: {correctness.get('param_match_rate', 0.0):.2f}")
         
         # Overall success
-        lines.append(f"\nOverall Success: {'Yes' if metrics.get('success', False) else 'No'}")
+        blank()
+        append(f"Overall Success: {'Yes' if metrics.get('success', False) else 'No'}")
         
         # Conversation metrics
-        lines.append(f"\nConversation Metrics:")
-        lines.append(f"- Total Turns (Human-Relevant): {conversation.get('total_turns', 0)}")
-        lines.append(f"- User Turns: {conversation.get('user_turns', 0)}")
-        lines.append(f"- Agent Turns: {conversation.get('agent_turns', 0)}")
-        lines.append(f"- Clarification Questions: {conversation.get('clarification_questions', 0)}")
-        lines.append(f"- Follow-up Requests: {conversation.get('follow_up_requests', 0)}")
+        blank()
+        append(f"Conversation Metrics:")
+        append(f"- Total Turns (Human-Relevant): {conversation.get('total_turns', 0)}")
+        append(f"- User Turns: {conversation.get('user_turns', 0)}")
+        append(f"- Agent Turns: {conversation.get('agent_turns', 0)}")
+        append(f"- Clarification Questions: {conversation.get('clarification_questions', 0)}")
+        append(f"- Follow-up Requests: {conversation.get('follow_up_requests', 0)}")
         
         # Question metrics
-        lines.append(f"\nQuestion Metrics:")
-        lines.append(f"- Total Questions: {questions.get('total', 0)}")
-        lines.append(f"- Total Candidate Questions: {questions.get('total_candidates', 0)}")
-        if questions.get('total_candidates', 0) > 0:
-            lines.append(f"- Selection Rate: {questions.get('total', 0) / questions.get('total_candidates', 1):.2f}")
-        lines.append(f"- Average EVPI: {questions.get('average_evpi', 0.0):.4f}")
-        lines.append(f"- Average Regret Reduction: {questions.get('average_regret_reduction', 0.0):.4f}")
-        lines.append(f"- Average UCB Score: {questions.get('average_ucb_score', 0.0):.4f}")
+        blank()
+        append(f"Question Metrics:")
+        append(f"- Total Questions: {questions_get('total', 0)}")
+        append(f"- Total Candidate Questions: {questions_get('total_candidates', 0)}")
+        if questions_get('total_candidates', 0) > 0:
+            append(f"- Selection Rate: {questions_get('total', 0) / questions_get('total_candidates', 1):.2f}")
+        append(f"- Average EVPI: {questions_get('average_evpi', 0.0):.4f}")
+        append(f"- Average Regret Reduction: {questions_get('average_regret_reduction', 0.0):.4f}")
+        append(f"- Average UCB Score: {questions_get('average_ucb_score', 0.0):.4f}")
         
         # Tool call attempt metrics 
-        lines.append(f"\nTool Call Attempt Metrics:")
-        lines.append(f"- Total Tool Call Attempts: {metrics.get('num_tool_call_attempts', 0)}")
+        blank()
+        append(f"Tool Call Attempt Metrics:")
+        append(f"- Total Tool Call Attempts: {metrics.get('num_tool_call_attempts', 0)}")
         
-        return "\n".join(lines)
\ No newline at end of file
+        return writer.result()
\ No newline at end of file
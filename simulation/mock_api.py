@@ -1,13 +1,42 @@
 from typing import Dict, List, Any, Optional, Tuple
+from collections import OrderedDict
 import logging
-import json
 import copy
 from core.tool_registry import ToolRegistry
 from core.uncertainty import ToolCall
 from core.tool_executor import ToolExecutor
+from utils.json_utils import hashable_key
 
 logger = logging.getLogger(__name__)
 
+# Sentinel for parameters missing from a tool call (None is a valid value)
+_MISSING = object()
+
+# Error codes reported by execute_tool, defined once so a return site can't
+# misspell one and each code is changed in a single place
+ERROR_INVALID_TOOL = "INVALID_TOOL"
+ERROR_UNKNOWN_TOOL = "UNKNOWN_TOOL"
+ERROR_MISSING_PARAMS = "MISSING_PARAMS"
+ERROR_INVALID_PARAM_VALUE = "INVALID_PARAM_VALUE"
+
+
+def _copy_parameters(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy tool parameters, only paying for a deep copy when values are nested."""
+    if any(isinstance(v, (dict, list)) for v in parameters.values()):
+        return copy.deepcopy(parameters)
+    return dict(parameters)
+
+
+def _parameters_key(parameters: Dict[str, Any]) -> Tuple:
+    """
+    Build a hashable key for a parameter dict.
+    
+    Value types are part of the key so equal-but-distinct values (1, 1.0, True)
+    don't collide. Raises TypeError if any value is unhashable.
+    """
+    return tuple(sorted((k, type(v), v) for k, v in parameters.items()))
+
+
 class MockAPIClient:
     """Mock API client for simulating tool execution."""
     
@@ -15,7 +44,8 @@ class MockAPIClient:
         self,
         ground_truth: Dict[str, Any],
         strict_validation: bool = False,
-        tool_registry: Optional[ToolRegistry] = None
+        tool_registry: Optional[ToolRegistry] = None,
+        cache_size: int = 0
     ):
         """
         Initialize a mock API client.
@@ -24,10 +54,20 @@ class MockAPIClient:
             ground_truth: Ground truth data for validation
             strict_validation: Whether to require exact parameter matching
             tool_registry: Registry of tool definitions (optional)
+            cache_size: Maximum number of execution and validation results to
+                memoize by their inputs (0 disables caching)
         """
         self.ground_truth = ground_truth
         self.strict_validation = strict_validation
         self.tool_registry = tool_registry
+        self.cache_size = cache_size
+        # Execution results are stored with the Tool they were validated against
+        self._exec_cache: "OrderedDict[Tuple, Tuple[Any, Dict[str, Any]]]" = OrderedDict()
+        self._validate_cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        
+        # Flattened argument schemas per tool name, tagged with the Tool they were
+        # built from so a re-registered tool is picked up again
+        self._tool_schemas: Dict[str, Tuple[Any, Tuple]] = {}
         
         # Extract ground truth tool calls
         self.gt_tool_calls = ground_truth.get("ground_truth_tool_calls", [])
@@ -38,6 +78,14 @@ class MockAPIClient:
             tool_name = tc.get("tool_name")
             if tool_name:
                 self.gt_tool_call_map[tool_name] = tc
+        
+        # Ground truth is fixed after construction, so precompute the lookups
+        # used on every execution and validation
+        # Dict keys act as an insertion-ordered set of ground truth tool names
+        self.gt_tool_names = dict.fromkeys(tc.get("tool_name") for tc in self.gt_tool_calls)
+        self.gt_params_map = {
+            name: tc.get("parameters", {}) for name, tc in self.gt_tool_call_map.items()
+        }
                 
         # Create a tool executor if we have a registry
         self.tool_executor = None
@@ -48,6 +96,71 @@ class MockAPIClient:
         self,
         tool_name: str,
         parameters: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Execute a tool call via the mock API, reusing memoized results if enabled.
+        
+        Args:
+            tool_name: Name of the tool to execute
+            parameters: Parameters for the tool
+            
+        Returns:
+            Execution result
+        """
+        if self.cache_size <= 0:
+            return self._execute_tool(tool_name, parameters)
+        
+        # The registered Tool and its argument domains decide whether a call
+        # validates, so the Tool's identity and the registry's domain version are
+        # part of the key; neither a tool registered after a call nor a domain
+        # updated in place is served a stale result. Each cache entry keeps its
+        # Tool alive, so the id can't be reused meanwhile.
+        if self.tool_registry:
+            tool = self.tool_registry.get_tool(tool_name)
+            domain_version = self.tool_registry.domain_version
+        else:
+            tool = None
+            domain_version = 0
+        
+        nested = False
+        try:
+            key = (tool_name, id(tool), domain_version, _parameters_key(parameters))
+            entry = self._exec_cache.get(key)
+        except TypeError:
+            # Nested (unhashable) values are keyed by their structure and types
+            try:
+                key = (tool_name, id(tool), domain_version, hashable_key(parameters))
+            except TypeError:
+                return self._execute_tool(tool_name, parameters)
+            entry = self._exec_cache.get(key)
+            nested = True
+        
+        if entry is None:
+            cached = self._execute_tool(tool_name, parameters)
+            # Results can reference nested parameter values, so keep a private copy
+            self._exec_cache[key] = (tool, copy.deepcopy(cached) if nested else cached)
+            if len(self._exec_cache) > self.cache_size:
+                self._exec_cache.popitem(last=False)
+        else:
+            self._exec_cache.move_to_end(key)
+            cached = entry[1]
+        
+        # Hand out a fresh result with this call's own copy of the parameters and of
+        # any nested values, so callers can't modify the cached entry
+        result = {}
+        for name, value in cached.items():
+            if name == "output":
+                result[name] = {**value, "parameters": _copy_parameters(parameters)}
+            elif isinstance(value, (dict, list)):
+                result[name] = copy.deepcopy(value)
+            else:
+                result[name] = value
+        return result
+    
+    def _execute_tool(
+        self,
+        tool_name: str,
+        parameters: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
         Execute a tool call via the mock API.
@@ -63,12 +176,14 @@ class MockAPIClient:
         Returns:
             Execution result
         """
-        # First check if the tool exists in ground truth (for simulation purposes)
-        if tool_name not in self.gt_tool_call_map:
+        # First check if the tool exists in ground truth (for simulation purposes);
+        # the single lookup also yields the parameters compared further down
+        gt_params = self.gt_params_map.get(tool_name, _MISSING)
+        if gt_params is _MISSING:
             return {
                 "success": False,
                 "message": f"Tool '{tool_name}' is not part of the ground truth",
-                "error": "INVALID_TOOL"
+                "error": ERROR_INVALID_TOOL
             }
         
         # If we have a tool registry, use it to validate the call properly
@@ -78,34 +193,37 @@ class MockAPIClient:
                 return {
                     "success": False,
                     "message": f"Tool '{tool_name}' not found in registry",
-                    "error": "UNKNOWN_TOOL"
+                    "error": ERROR_UNKNOWN_TOOL
                 }
             
             # Check required parameters
-            for arg in tool.arguments:
-                if arg.required and arg.name not in parameters:
-                    return {
-                        "success": False,
-                        "message": f"Missing required parameter: {arg.name}",
-                        "error": "MISSING_PARAMS",
-                        "details": {
-                            "missing_params": [arg.name]
-                        }
-                    }
-                
-                # Validate parameter values if present and not <UNK>
-                if arg.name in parameters and parameters[arg.name] != "<UNK>":
-                    if not arg.domain.is_valid(parameters[arg.name]):
+            parameters_get = parameters.get
+            for arg_name, required, is_valid, domain in self._get_tool_schema(tool_name, tool):
+                value = parameters_get(arg_name, _MISSING)
+                if value is _MISSING:
+                    if required:
                         return {
                             "success": False,
-                            "message": f"Invalid value for parameter {arg.name}: {parameters[arg.name]}",
-                            "error": "INVALID_PARAM_VALUE",
+                            "message": f"Missing required parameter: {arg_name}",
+                            "error": ERROR_MISSING_PARAMS,
                             "details": {
-                                "invalid_param": arg.name,
-                                "value": parameters[arg.name],
-                                "expected_domain": str(arg.domain)
+                                "missing_params": [arg_name]
                             }
                         }
+                    continue
+                
+                # Validate parameter values if present and not <UNK>
+                if value != "<UNK>" and not is_valid(value):
+                    return {
+                        "success": False,
+                        "message": f"Invalid value for parameter {arg_name}: {value}",
+                        "error": ERROR_INVALID_PARAM_VALUE,
+                        "details": {
+                            "invalid_param": arg_name,
+                            "value": value,
+                            "expected_domain": str(domain)
+                        }
+                    }
         
         # Execute the tool with provided parameters
         execution_result = {
@@ -113,27 +231,36 @@ class MockAPIClient:
             "message": f"Tool '{tool_name}' executed successfully",
             "output": {
                 "tool_name": tool_name,
-                "parameters": copy.deepcopy(parameters)
+                "parameters": _copy_parameters(parameters)
             }
         }
         
         # Compare parameters for correctness after successful execution
-        gt_params = self.gt_tool_call_map[tool_name].get("parameters", {})
         incorrect_params = []
+        missing_in_gt = []
         if self.strict_validation:
+            # One pass over the ground truth finds both missing and incorrect parameters
+            parameters_get = parameters.get
             for param_name, gt_value in gt_params.items():
-                if param_name in parameters and parameters[param_name] != gt_value:
+                actual_value = parameters_get(param_name, _MISSING)
+                if actual_value is _MISSING:
+                    missing_in_gt.append(param_name)
+                elif actual_value != gt_value:
                     incorrect_params.append({
                         "param": param_name,
                         "expected": gt_value,
-                        "actual": parameters[param_name]
+                        "actual": actual_value
                     })
+        elif not gt_params.keys() <= parameters.keys():
+            # The key-view subset test runs in C and covers the common all-present case
+            missing_in_gt = [p for p in gt_params if p not in parameters]
         
-        # Check for missing parameters compared to ground truth
-        missing_in_gt = [p for p in gt_params if p not in parameters]
-        
-        # Check for extra parameters compared to ground truth
-        extra_params = [p for p in parameters if p not in gt_params]
+        # Check for extra parameters compared to ground truth. Every ground truth
+        # parameter that is not missing is present, so extras exist exactly when
+        # the call has more parameters than that.
+        extra_params = []
+        if len(parameters) > len(gt_params) - len(missing_in_gt):
+            extra_params = [p for p in parameters if p not in gt_params]
         
         # Add correctness information
         if incorrect_params:
@@ -154,6 +281,28 @@ class MockAPIClient:
         
         return execution_result
     
+    def _get_tool_schema(self, tool_name: str, tool: Any) -> Tuple:
+        """
+        Get a tool's arguments as flat (name, required, is_valid, domain) tuples.
+        
+        Args:
+            tool_name: Name of the tool
+            tool: Tool definition currently registered under that name
+            
+        Returns:
+            Tuple of per-argument tuples in declaration order
+        """
+        cached = self._tool_schemas.get(tool_name)
+        if cached is not None and cached[0] is tool:
+            return cached[1]
+        
+        schema = tuple(
+            (arg.name, arg.required, arg.domain.is_valid, arg.domain)
+            for arg in tool.arguments
+        )
+        self._tool_schemas[tool_name] = (tool, schema)
+        return schema
+    
     def execute_tool_sequence(
         self,
         tool_calls: List[Dict[str, Any]]
@@ -184,7 +333,8 @@ class MockAPIClient:
     
     def validate_tool_calls_against_ground_truth(
         self,
-        tool_calls: List[Dict[str, Any]]
+        tool_calls: List[Dict[str, Any]],
+        detail: bool = True
     ) -> Dict[str, Any]:
         """
         Validate if a sequence of tool calls matches the ground truth.
@@ -192,42 +342,94 @@ class MockAPIClient:
         
         Args:
             tool_calls: List of tool calls to validate
+            detail: Whether to report matching, missing and incorrect parameters
+                per tool; when False only each tool's all_correct flag is computed
             
         Returns:
             Validation results
         """
-        # Create sets of tool names for comparison
-        gt_tool_names = {tc.get("tool_name") for tc in self.gt_tool_calls}
-        actual_tool_names = {tc.get("tool_name") for tc in tool_calls}
+        if self.cache_size <= 0:
+            return self._validate_tool_calls(tool_calls, detail)
         
-        # Check for missing tools
-        missing_tools = gt_tool_names - actual_tool_names
+        try:
+            key = (detail, tuple(
+                (tc.get("tool_name"), _parameters_key(tc.get("parameters", {})))
+                for tc in tool_calls
+            ))
+            cached = self._validate_cache.get(key)
+        except TypeError:
+            # Nested (unhashable) values are keyed by their structure and types
+            try:
+                key = (detail, tuple(
+                    (tc.get("tool_name"), hashable_key(tc.get("parameters", {})))
+                    for tc in tool_calls
+                ))
+            except TypeError:
+                return self._validate_tool_calls(tool_calls, detail)
+            cached = self._validate_cache.get(key)
         
-        # Check for extra tools
-        extra_tools = actual_tool_names - gt_tool_names
+        if cached is None:
+            cached = self._validate_tool_calls(tool_calls, detail)
+            self._validate_cache[key] = copy.deepcopy(cached)
+            if len(self._validate_cache) > self.cache_size:
+                self._validate_cache.popitem(last=False)
+            return cached
         
-        # Check parameter correctness
+        self._validate_cache.move_to_end(key)
+        return copy.deepcopy(cached)
+    
+    def _validate_tool_calls(
+        self,
+        tool_calls: List[Dict[str, Any]],
+        detail: bool
+    ) -> Dict[str, Any]:
+        """Validate tool calls against the ground truth without caching."""
+        # Classify tool names and check parameters in a single pass over the calls;
+        # extra tools keep first-seen order
+        gt_tool_names = self.gt_tool_names
+        gt_params_map = self.gt_params_map
+        actual_tool_names = set()
+        extra_tools = []
         tool_parameter_matches = {}
         for tc in tool_calls:
-            tool_name = tc.get("tool_name", "")
-            if tool_name in self.gt_tool_call_map:
-                gt_params = self.gt_tool_call_map[tool_name].get("parameters", {})
+            tool_name = tc.get("tool_name")
+            if tool_name not in actual_tool_names:
+                actual_tool_names.add(tool_name)
+                if tool_name not in gt_tool_names:
+                    extra_tools.append(tool_name)
+            
+            # Check parameter correctness
+            if tool_name in gt_params_map:
+                gt_params = gt_params_map[tool_name]
                 actual_params = tc.get("parameters", {})
+                actual_get = actual_params.get
+                
+                if not detail:
+                    # Stop at the first wrong parameter without building detail lists
+                    tool_correct = True
+                    for param_name, gt_value in gt_params.items():
+                        actual_value = actual_get(param_name, _MISSING)
+                        if actual_value is _MISSING or not actual_value == gt_value:
+                            tool_correct = False
+                            break
+                    tool_parameter_matches[tool_name] = {"all_correct": tool_correct}
+                    continue
                 
                 matching_params = []
                 missing_params = []
                 incorrect_params = []
                 
                 for param_name, gt_value in gt_params.items():
-                    if param_name not in actual_params:
+                    actual_value = actual_get(param_name, _MISSING)
+                    if actual_value is _MISSING:
                         missing_params.append(param_name)
-                    elif actual_params[param_name] == gt_value:
+                    elif actual_value == gt_value:
                         matching_params.append(param_name)
                     else:
                         incorrect_params.append({
                             "param": param_name,
                             "expected": gt_value,
-                            "actual": actual_params[param_name]
+                            "actual": actual_value
                         })
                 
                 tool_parameter_matches[tool_name] = {
@@ -237,6 +439,9 @@ class MockAPIClient:
                     "all_correct": len(missing_params) == 0 and len(incorrect_params) == 0
                 }
         
+        # Check for missing tools, in ground truth order
+        missing_tools = [name for name in gt_tool_names if name not in actual_tool_names]
+        
         # Determine overall correctness
         all_correct = (
             len(missing_tools) == 0 and 
@@ -246,7 +451,7 @@ class MockAPIClient:
         
         return {
             "all_correct": all_correct,
-            "missing_tools": list(missing_tools),
-            "extra_tools": list(extra_tools),
+            "missing_tools": missing_tools,
+            "extra_tools": extra_tools,
             "tool_parameter_matches": tool_parameter_matches
         }
\ No newline at end of file
@@ -4,54 +4,139 @@ agentic disambiguation system.
 """
 
 import os
-import json
 import glob
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import cm
-from typing import Dict, List, Any, Tuple, Optional
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize
+from typing import Dict, List, Any, Tuple, Optional, Union, NamedTuple
 import logging
+from functools import lru_cache
 import seaborn as sns
 
+try:
+    from utils.json_utils import read_json
+    from utils.plotting import save_figure
+except ImportError:
+    # Run as a script from inside utils/
+    from json_utils import read_json
+    from plotting import save_figure
+
 logger = logging.getLogger(__name__)
 
+
+class StepArrays(NamedTuple):
+    """UCB components of every question at one step, pooled across simulations."""
+    evpi: np.ndarray
+    regret_reduction: np.ndarray
+    exploration: np.ndarray
+
+
+def _ucb_matrix(evpi: np.ndarray, regret_reduction: np.ndarray,
+                exploration: np.ndarray, c_arr: np.ndarray) -> np.ndarray:
+    """
+    Recalculate the UCB of every question for every exploration constant.
+    
+    The c-independent part is summed once per question and added in place to
+    the rank-1 outer product of c and the exploration term, so the result is
+    the only (len(c), n_questions) allocation. The sums match _recalculate_ucb.
+    
+    Returns:
+        Array of shape (len(c_arr), n_questions)
+    """
+    ucb = np.multiply.outer(c_arr, exploration)
+    ucb += evpi + regret_reduction
+    return ucb
+
+
+@lru_cache(maxsize=None)
+def _count_exceed_kernel():
+    """
+    Compile the threshold-exceedance counting kernel with numba on first use, so
+    analyzers that don't ask for numba never import it.
+    
+    Returns:
+        The compiled kernel, or None if numba is not installed
+    """
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+    
+    @njit(parallel=True, cache=True)
+    def count_exceed(evpi, regret_reduction, exploration, c_arr, thresholds):
+        """Count questions whose recalculated UCB exceeds each threshold, for every c."""
+        counts = np.zeros((c_arr.shape[0], thresholds.shape[0]), dtype=np.int64)
+        for c_idx in prange(c_arr.shape[0]):
+            c = c_arr[c_idx]
+            for i in range(evpi.shape[0]):
+                ucb = evpi[i] + regret_reduction[i] + c * exploration[i]
+                for t_idx in range(thresholds.shape[0]):
+                    if ucb > thresholds[t_idx]:
+                        counts[c_idx, t_idx] += 1
+        return counts
+    
+    return count_exceed
+
+
 class HyperparameterAnalyzer:
     """Clean, focused class for visualizing hyperparameter effects on question selection."""
     
-    def __init__(self, results_dir: str = "simulation_results"):
+    def __init__(self, results_dir: str = "simulation_results", use_numba: bool = False):
         """
         Initialize a hyperparameter analyzer.
         
         Args:
             results_dir: Directory containing simulation result files
+            use_numba: Count threshold exceedances with a JIT-compiled kernel when
+                numba is installed (worth the compile time only for large sweeps)
         """
         self.results_dir = results_dir
+        self.use_numba = use_numba and _count_exceed_kernel() is not None
+        if use_numba and not self.use_numba:
+            logger.warning("numba is not installed; falling back to NumPy for threshold sweeps")
         self.simulation_data = []
         
+        # Step grouping per simulation, keyed by id() and tagged with the data object
+        # itself so a recycled id never serves a stale grouping
+        self._qbs_cache: Dict[int, Tuple[Dict[str, Any], Dict[int, List[Dict[str, Any]]]]] = {}
+        
+        # Per-step UCB component arrays pooled across all simulations, plus the
+        # (list, length) they were built from
+        self._step_pool: Dict[int, StepArrays] = {}
+        self._step_pool_source: Optional[Tuple[List[Dict[str, Any]], int]] = None
+        
     def load_simulation_results(self, file_pattern: str = "*.json") -> int:
         """Load simulation results from files."""
         pattern = os.path.join(self.results_dir, file_pattern)
         files = glob.glob(pattern)
-        
-        for file_path in files:
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
+        self._qbs_cache.clear()
+        
+        # Reads and parses overlap across threads; results are collected in glob order
+        with ThreadPoolExecutor(max_workers=max(1, min(32, len(files)))) as executor:
+            futures = [executor.submit(read_json, file_path) for file_path in files]
+            for file_path, future in zip(files, futures):
+                try:
+                    data = future.result()
                     self.simulation_data.append(data)
                     logger.info(f"Loaded simulation file: {file_path}")
-            except Exception as e:
-                logger.error(f"Error loading {file_path}: {e}")
+                except Exception as e:
+                    logger.error(f"Error loading {file_path}: {e}")
         
+        self._build_step_pool()
         return len(self.simulation_data)
     
     def load_single_result(self, file_path: str) -> Dict[str, Any]:
         """Load a single simulation result file."""
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                self.simulation_data = [data]
-                logger.info(f"Loaded single file: {file_path}")
-                return data
+            data = read_json(file_path)
+            self.simulation_data = [data]
+            self._qbs_cache.clear()
+            self._build_step_pool()
+            logger.info(f"Loaded single file: {file_path}")
+            return data
         except Exception as e:
             logger.error(f"Error loading {file_path}: {e}")
             return {}
@@ -74,36 +159,169 @@ class HyperparameterAnalyzer:
         
         return new_ucb
     
-    def _calculate_threshold(self, base: float, alpha: float, step: int) -> float:
-        """Calculate the threshold for a given step with specified parameters."""
+    def _calculate_threshold(self,
+                             base: Union[float, np.ndarray],
+                             alpha: Union[float, np.ndarray],
+                             step: Union[int, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        Calculate the threshold for a given step with specified parameters.
+        
+        Any argument may be an array, in which case a whole threshold table is
+        built in one broadcast, e.g. base values of shape (1, n_base) against
+        step offsets of shape (n_steps, 1).
+        """
         return base + alpha * step
     
     def _get_questions_by_step(self, data: Dict[str, Any]) -> Dict[int, List[Dict[str, Any]]]:
         """Group questions by step based on question_id patterns."""
-        questions_by_step = {}
-        step = 0
+        cached = self._qbs_cache.get(id(data))
+        if cached is not None and cached[0] is data:
+            return cached[1]
         
         # Process questions
         questions = data.get("questions", [])
         
         if not questions:
             return {}
+        
+        # Each q_0 question opens a new step; questions before the first one are skipped
+        step_starts = np.flatnonzero(np.fromiter(
+            (q.get("question_id", "").startswith("q_0") for q in questions),
+            dtype=bool, count=len(questions)
+        )).tolist()
+        bounds = step_starts + [len(questions)]
+        questions_by_step = {
+            step: questions[bounds[step - 1]:bounds[step]]
+            for step in range(1, len(step_starts) + 1)
+        }
+        
+        self._qbs_cache[id(data)] = (data, questions_by_step)
+        return questions_by_step
+    
+    def _build_step_pool(self) -> None:
+        """Pool the UCB components of every question per step across all simulations."""
+        components: Dict[int, Tuple[List[float], List[float], List[float]]] = {}
+        
+        for data in self.simulation_data:
+            for step, step_questions in self._get_questions_by_step(data).items():
+                evpi_values, regret_values, exploration_values = components.setdefault(step, ([], [], []))
+                for q in step_questions:
+                    metrics = q.get("metrics", {})
+                    evpi = metrics.get("evpi", 0)
+                    regret_reduction = metrics.get("regret_reduction", 0)
+                    evpi_values.append(evpi)
+                    regret_values.append(regret_reduction)
+                    # Same exploration term as _recalculate_ucb (original c=1.0)
+                    exploration_values.append(metrics.get("ucb_score", 0) - evpi - regret_reduction)
+        
+        self._step_pool = {
+            step: StepArrays(*(np.array(values, dtype=float) for values in arrays))
+            for step, arrays in components.items()
+        }
+        self._step_pool_source = (self.simulation_data, len(self.simulation_data))
+    
+    def _get_step_arrays(self, step: int) -> StepArrays:
+        """
+        Get the UCB components of every question at a step across all simulations.
+        
+        Args:
+            step: Clarification step to collect
             
-        for q in questions:
-            q_id = q.get("question_id", "")
+        Returns:
+            StepArrays of (evpi, regret_reduction, exploration) arrays, one entry per question
+        """
+        # Rebuild if simulation_data was replaced or extended outside the loaders
+        source = self._step_pool_source
+        if source is None or source[0] is not self.simulation_data or source[1] != len(self.simulation_data):
+            self._build_step_pool()
+        
+        empty = np.array([], dtype=float)
+        return self._step_pool.get(step, StepArrays(empty, empty, empty))
+    
+    def _exceedance_proportions(self,
+                                step_arrays: StepArrays,
+                                c_values: List[float],
+                                thresholds: List[float]) -> np.ndarray:
+        """
+        Compute the proportion of questions whose recalculated UCB exceeds each threshold.
+        
+        Args:
+            step_arrays: (evpi, regret_reduction, exploration_term) arrays for one step
+            c_values: Exploration constants to evaluate
+            thresholds: Thresholds to compare against
             
-            # Detect new step by looking for q_0 pattern
-            if q_id.startswith("q_0"):
-                step += 1
-                questions_by_step[step] = []
-                
-            # Make sure we have a valid step
-            if step > 0:
-                if step not in questions_by_step:
-                    questions_by_step[step] = []
-                questions_by_step[step].append(q)
+        Returns:
+            Array of shape (len(c_values), len(thresholds)) with proportions
+        """
+        evpi, regret_reduction, exploration = step_arrays
+        total_questions = len(evpi)
+        if total_questions == 0:
+            return np.zeros((len(c_values), len(thresholds)))
         
-        return questions_by_step
+        c_arr = np.asarray(c_values, dtype=float)
+        threshold_arr = np.asarray(thresholds, dtype=float)
+        
+        if self.use_numba:
+            counts = _count_exceed_kernel()(evpi, regret_reduction, exploration, c_arr, threshold_arr)
+        else:
+            ucb = _ucb_matrix(evpi, regret_reduction, exploration, c_arr)
+            
+            # Count exceedances for every (c, threshold) pair at once
+            counts = (ucb[:, None, :] > threshold_arr[None, :, None]).sum(axis=2)
+        
+        return counts / total_questions
+    
+    def _exceedance_by_step(self,
+                            c_values: List[float],
+                            step_thresholds: np.ndarray) -> np.ndarray:
+        """
+        Compute exceedance proportions for steps 1..n in one fused pass.
+        
+        The questions of all requested steps are concatenated, every question is
+        compared against its own step's thresholds in a single broadcast, and the
+        counts are reduced back per step.
+        
+        Args:
+            c_values: Exploration constants to evaluate
+            step_thresholds: Array of shape (n_steps, n_thresholds); row i holds
+                the thresholds for step i+1
+            
+        Returns:
+            Array of shape (n_steps, len(c_values), n_thresholds) with proportions
+        """
+        step_thresholds = np.asarray(step_thresholds, dtype=float)
+        n_steps = step_thresholds.shape[0]
+        arrays = [self._get_step_arrays(step) for step in range(1, n_steps + 1)]
+        
+        if self.use_numba:
+            if not arrays:
+                return np.zeros((0, len(c_values), step_thresholds.shape[1]))
+            return np.stack([
+                self._exceedance_proportions(step_arrays, c_values, step_thresholds[i])
+                for i, step_arrays in enumerate(arrays)
+            ])
+        
+        sizes = np.array([len(step_arrays[0]) for step_arrays in arrays], dtype=np.intp)
+        evpi, regret_reduction, exploration = (
+            np.concatenate([step_arrays[k] for step_arrays in arrays] + [np.array([], dtype=float)])
+            for k in range(3)
+        )
+        
+        # Threshold row of each question's step: shape (n_questions, n_thresholds)
+        question_thresholds = np.repeat(step_thresholds, sizes, axis=0)
+        
+        ucb = _ucb_matrix(evpi, regret_reduction, exploration, np.asarray(c_values, dtype=float))
+        exceed = ucb[:, :, None] > question_thresholds[None, :, :]
+        
+        # Per-step counts from the running total at each step boundary
+        running = np.zeros((len(c_values), len(evpi) + 1, step_thresholds.shape[1]), dtype=np.int64)
+        np.cumsum(exceed, axis=1, out=running[:, 1:, :])
+        bounds = np.concatenate(([0], np.cumsum(sizes)))
+        counts = running[:, bounds[1:], :] - running[:, bounds[:-1], :]
+        
+        totals = np.maximum(sizes, 1)[None, :, None]
+        proportions = np.where(sizes[None, :, None] > 0, counts / totals, 0.0)
+        return proportions.transpose(1, 0, 2)
     
     def _get_max_step(self) -> int:
         """Get the maximum step number found in the data."""
@@ -118,7 +336,10 @@ class HyperparameterAnalyzer:
                              c_values: List[float],
                              base_values: List[float],
                              alpha_value: float,
-                             output_path: Optional[str] = None) -> None:
+                             output_path: Optional[str] = None,
+                             dpi: int = 300,
+                             fig: Optional[plt.Figure] = None,
+                             axes: Optional[List[plt.Axes]] = None) -> None:
         """
         Create a clear grid visualization showing parameter impact across all steps.
         
@@ -130,6 +351,10 @@ class HyperparameterAnalyzer:
             base_values: List of base threshold values to test
             alpha_value: Alpha value to use
             output_path: Path to save the visualization
+            dpi: Resolution of the saved image
+            fig: Figure from _create_grid_figure to redraw instead of creating a new one;
+                it is cleared but left open so the caller can reuse it
+            axes: Step axes belonging to fig
         """
         if not self.simulation_data:
             logger.error("No simulation data loaded")
@@ -146,63 +371,43 @@ class HyperparameterAnalyzer:
         # Add one to max_step since steps are 1-indexed
         n_steps = min(max_step, 4)  # Limit to 4 steps for readability
         
-        # Set up the figure with subplots
-        fig, axes = plt.subplots(1, n_steps, figsize=(5*n_steps, 6), sharey=True)
-        
-        # Handle case with only one step
-        if n_steps == 1:
-            axes = [axes]
+        # Set up the figure with subplots, or clear the caller's step axes for reuse
+        # (the shared colorbar is the same for every grid and is kept)
+        owns_figure = fig is None
+        if owns_figure:
+            fig, axes = self._create_grid_figure(n_steps)
+        else:
+            for ax in axes:
+                ax.cla()
+        
+        # Dynamic threshold of every (step, base) pair, then the proportion of
+        # questions exceeding it for every (step, c, base) in one pass
+        step_offsets = np.arange(n_steps)[:, None]
+        thresholds = self._calculate_threshold(np.asarray(base_values, dtype=float)[None, :],
+                                               alpha_value, step_offsets)
+        grid_data = self._exceedance_by_step(c_values, thresholds)
+        
+        # Cell labels and their colors for every step, built in one vectorized pass
+        grid_labels = np.char.mod('%.2f', grid_data)
+        grid_text_colors = np.where(grid_data > 0.5, 'white', 'black')
+        label_rows, label_cols = np.indices(grid_data.shape[1:])
+        label_rows, label_cols = label_rows.ravel(), label_cols.ravel()
         
         # Process each step
         for step_idx, step in enumerate(range(1, n_steps+1)):
             ax = axes[step_idx]
-            
-            # Create a heatmap matrix for this step
-            heatmap_data = np.zeros((len(c_values), len(base_values)))
-            
-            # Calculate proportion values for each parameter combination
-            for c_idx, c in enumerate(c_values):
-                for base_idx, base in enumerate(base_values):
-                    # Calculate dynamic threshold for this step and parameters
-                    threshold = self._calculate_threshold(base, alpha_value, step-1)
-                    
-                    # Count questions exceeding threshold
-                    questions_exceeding = 0
-                    total_questions = 0
-                    
-                    # Process each simulation
-                    for data in self.simulation_data:
-                        questions_by_step = self._get_questions_by_step(data)
-                        
-                        if step in questions_by_step:
-                            step_questions = questions_by_step[step]
-                            total_questions += len(step_questions)
-                            
-                            # Check each question
-                            for q in step_questions:
-                                ucb = self._recalculate_ucb(q, c)
-                                if ucb > threshold:
-                                    questions_exceeding += 1
-                    
-                    # Calculate proportion
-                    if total_questions > 0:
-                        proportion = questions_exceeding / total_questions
-                    else:
-                        proportion = 0
-                    
-                    heatmap_data[c_idx, base_idx] = proportion
+            heatmap_data = grid_data[step_idx]
             
             # Create heatmap
-            im = ax.imshow(heatmap_data, cmap='viridis', origin='lower', vmin=0, vmax=1, 
-                          aspect='auto')
+            ax.imshow(heatmap_data, cmap='viridis', origin='lower', vmin=0, vmax=1,
+                      aspect='auto')
             
             # Add text annotations
-            for c_idx in range(len(c_values)):
-                for base_idx in range(len(base_values)):
-                    value = heatmap_data[c_idx, base_idx]
-                    text_color = 'white' if value > 0.5 else 'black'
-                    ax.text(base_idx, c_idx, f'{value:.2f}', 
-                           ha='center', va='center', color=text_color, fontsize=9)
+            for c_idx, base_idx, label, text_color in zip(label_rows, label_cols,
+                                                          grid_labels[step_idx].ravel(),
+                                                          grid_text_colors[step_idx].ravel()):
+                ax.text(base_idx, c_idx, label,
+                        ha='center', va='center', color=text_color, fontsize=9)
             
             # Set axes labels and ticks
             ax.set_xticks(range(len(base_values)))
@@ -216,32 +421,49 @@ class HyperparameterAnalyzer:
             ax.set_xlabel('Base threshold')
             ax.set_title(f'Step {step}')
         
-        # Add colorbar
-        cbar_ax = fig.add_axes([0.92, 0.15, 0.02, 0.7])
-        cbar = fig.colorbar(im, cax=cbar_ax)
-        cbar.set_label('Proportion of questions\nexceeding threshold')
-        
         # Add overall title
-        plt.suptitle(f'Parameter Impact Across Steps (alpha={alpha_value})', 
-                    fontsize=16, y=0.98)
-        
-        # Adjust layout
-        plt.tight_layout(rect=[0, 0, 0.9, 0.95])
+        fig.suptitle(f'Parameter Impact Across Steps (alpha={alpha_value})', fontsize=16)
         
         # Save or show
         if output_path:
-            plt.savefig(output_path, dpi=300, bbox_inches='tight')
-            plt.close()
+            save_figure(output_path, dpi, fig)
+            if owns_figure:
+                plt.close(fig)
         else:
             plt.show()
     
+    def _create_grid_figure(self, n_steps: int) -> Tuple[plt.Figure, List[plt.Axes]]:
+        """
+        Create the figure used by create_multi_step_grid.
+        
+        Args:
+            n_steps: Number of step heatmaps in the grid
+            
+        Returns:
+            Tuple of (figure, step axes); the figure also holds the colorbar
+        """
+        # constrained_layout places the colorbar and suptitle in a single layout pass
+        fig, axes = plt.subplots(1, n_steps, figsize=(5*n_steps, 6), sharey=True,
+                                 constrained_layout=True)
+        
+        # Handle case with only one step
+        if n_steps == 1:
+            axes = [axes]
+        
+        # Every heatmap uses the same 0-1 viridis scale, so the colorbar is drawn once
+        fig.colorbar(ScalarMappable(norm=Normalize(vmin=0, vmax=1), cmap='viridis'),
+                     ax=axes, shrink=0.7,
+                     label='Proportion of questions\nexceeding threshold')
+        return fig, list(axes)
+    
     def create_step_line_comparison(self,
                                   parameter_type: str,
                                   parameter_values: List[float],
                                   fixed_c: float = 1.0,
                                   fixed_base: float = 0.1,
                                   fixed_alpha: float = 0.05,
-                                  output_path: Optional[str] = None) -> None:
+                                  output_path: Optional[str] = None,
+                                  dpi: int = 300) -> None:
         """
         Create line charts showing how a parameter affects selection across steps.
         
@@ -252,6 +474,7 @@ class HyperparameterAnalyzer:
             fixed_base: Fixed value for base threshold when varying other parameters
             fixed_alpha: Fixed value for alpha when varying other parameters
             output_path: Path to save the visualization
+            dpi: Resolution of the saved image
         """
         if not self.simulation_data:
             logger.error("No simulation data loaded")
@@ -271,68 +494,48 @@ class HyperparameterAnalyzer:
         n_values = len(parameter_values)
         colors = plt.cm.viridis(np.linspace(0, 1, n_values))
         
+        # Proportions for every parameter value at every step, computed for all
+        # steps and parameter values in one fused pass
+        param_arr = np.asarray(parameter_values, dtype=float)
+        step_offsets = np.arange(max_step)[:, None]
+        proportions = np.zeros((n_values, max_step))
+        if parameter_type == 'c':
+            thresholds = self._calculate_threshold(fixed_base, fixed_alpha, step_offsets)
+            proportions = self._exceedance_by_step(param_arr, thresholds)[:, :, 0].T
+        elif parameter_type == 'base':
+            thresholds = self._calculate_threshold(param_arr[None, :], fixed_alpha, step_offsets)
+            proportions = self._exceedance_by_step([fixed_c], thresholds)[:, 0, :].T
+        elif parameter_type == 'alpha':
+            thresholds = self._calculate_threshold(fixed_base, param_arr[None, :], step_offsets)
+            proportions = self._exceedance_by_step([fixed_c], thresholds)[:, 0, :].T
+        
+        # Annotation text for every point, formatted in one pass
+        value_labels = np.char.mod('%.2f', proportions)
+        steps = range(1, max_step + 1)
+        
         # Process each parameter value
         for idx, param_value in enumerate(parameter_values):
-            # Set the parameters based on which one we're varying
+            # Label the line by the parameter we're varying
             if parameter_type == 'c':
-                c = param_value
-                base = fixed_base
-                alpha = fixed_alpha
                 label = f'c = {param_value:.2f}'
             elif parameter_type == 'base':
-                c = fixed_c
-                base = param_value
-                alpha = fixed_alpha
                 label = f'base = {param_value:.2f}'
             elif parameter_type == 'alpha':
-                c = fixed_c
-                base = fixed_base
-                alpha = param_value
                 label = f'alpha = {param_value:.2f}'
             else:
                 logger.error(f"Unknown parameter type: {parameter_type}")
                 return
             
-            # Calculate proportion values for each step
-            step_values = []
-            
-            for step in range(1, max_step + 1):
-                # Calculate dynamic threshold for this step and parameters
-                threshold = self._calculate_threshold(base, alpha, step-1)
-                
-                # Count questions exceeding threshold
-                questions_exceeding = 0
-                total_questions = 0
-                
-                # Process each simulation
-                for data in self.simulation_data:
-                    questions_by_step = self._get_questions_by_step(data)
-                    
-                    if step in questions_by_step:
-                        step_questions = questions_by_step[step]
-                        total_questions += len(step_questions)
-                        
-                        # Check each question
-                        for q in step_questions:
-                            ucb = self._recalculate_ucb(q, c)
-                            if ucb > threshold:
-                                questions_exceeding += 1
-                
-                # Calculate proportion
-                if total_questions > 0:
-                    proportion = questions_exceeding / total_questions
-                else:
-                    proportion = 0
-                
-                step_values.append(proportion)
+            # Proportion values for each step
+            step_values = proportions[idx]
             
             # Plot line for this parameter value
-            plt.plot(range(1, len(step_values) + 1), step_values, 'o-', 
+            plt.plot(steps, step_values, 'o-', 
                     color=colors[idx], linewidth=2, markersize=8, label=label)
             
             # Add value annotations
-            for step, value in enumerate(step_values, 1):
-                plt.annotate(f'{value:.2f}', (step, value),
+            for step, value, text in zip(steps, step_values, value_labels[idx]):
+                plt.annotate(text, (step, value),
                            xytext=(0, 10), textcoords='offset points',
                            ha='center', va='bottom', fontsize=8)
         
@@ -371,7 +574,7 @@ class HyperparameterAnalyzer:
         
         # Save or show
         if output_path:
-            plt.savefig(output_path, dpi=300, bbox_inches='tight')
+            save_figure(output_path, dpi)
             plt.close()
         else:
             plt.show()
@@ -381,7 +584,8 @@ class HyperparameterAnalyzer:
                                    base_threshold: float,
                                    alpha_value: float,
                                    step: int = 1,
-                                   output_path: Optional[str] = None) -> None:
+                                   output_path: Optional[str] = None,
+                                   dpi: int = 300) -> None:
         """
         Create a clear visualization of UCB score distributions for different c values.
         
@@ -391,6 +595,7 @@ class HyperparameterAnalyzer:
             alpha_value: Alpha value
             step: Clarification step to analyze (default: 1)
             output_path: Path to save the visualization
+            dpi: Resolution of the saved image
         """
         if not self.simulation_data:
             logger.error("No simulation data loaded")
@@ -412,7 +617,8 @@ class HyperparameterAnalyzer:
         threshold = self._calculate_threshold(base_threshold, alpha_value, step-1)
         
         # Set up the figure with subplots - one per c value
-        fig, axes = plt.subplots(1, len(c_values), figsize=(5*len(c_values), 6), sharey=True)
+        fig, axes = plt.subplots(1, len(c_values), figsize=(5*len(c_values), 6), sharey=True,
+                                 constrained_layout=True)
         
         # Handle case with only one c value
         if len(c_values) == 1:
@@ -432,8 +638,7 @@ class HyperparameterAnalyzer:
             bars = ax.bar(range(len(ucb_scores)), ucb_scores, color=colors)
             
             # Add value annotations
-            for j, score in enumerate(ucb_scores):
-                ax.text(j, score + 0.05, f'{score:.2f}', ha='center')
+            ax.bar_label(bars, fmt='%.2f', padding=3)
             
             # Add threshold line
             ax.axhline(y=threshold, color='black', linestyle='--',
@@ -463,12 +668,9 @@ class HyperparameterAnalyzer:
         plt.suptitle(f'UCB Score Distribution (Step {step})\n' +
                     f'base={base_threshold}, alpha={alpha_value}', fontsize=16)
         
-        # Adjust layout
-        plt.tight_layout(rect=[0, 0, 1, 0.95])
-        
         # Save or show
         if output_path:
-            plt.savefig(output_path, dpi=300, bbox_inches='tight')
+            save_figure(output_path, dpi)
             plt.close()
         else:
             plt.show()
@@ -477,7 +679,8 @@ class HyperparameterAnalyzer:
                                 output_dir: str = "hyperparameter_analysis",
                                 c_values: List[float] = [0.5, 1.0, 1.5, 2.0, 3.0],
                                 base_values: List[float] = [0.05, 0.1, 0.15, 0.2, 0.25, 0.3],
-                                alpha_values: List[float] = [0.01, 0.03, 0.05, 0.08, 0.1]) -> None:
+                                alpha_values: List[float] = [0.01, 0.03, 0.05, 0.08, 0.1],
+                                dpi: int = 150) -> None:
         """
         Create all visualizations with default parameters and save to output directory.
         
@@ -486,34 +689,40 @@ class HyperparameterAnalyzer:
             c_values: List of c values to test
             base_values: List of base threshold values to test
             alpha_values: List of alpha values to test
+            dpi: Resolution of the saved images (use 300 for publication figures)
         """
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         
-        # 1. Create multi-step grids for each alpha value
+        # 1. Create multi-step grids for each alpha value, redrawing one shared figure
+        n_steps = min(self._get_max_step(), 4)
+        grid_fig, grid_axes = self._create_grid_figure(n_steps) if n_steps else (None, None)
         for alpha in alpha_values:
             alpha_str = f"{alpha:.2f}".replace(".", "_")
             output_path = os.path.join(output_dir, f"grid_alpha_{alpha_str}.png")
-            self.create_multi_step_grid(c_values, base_values, alpha, output_path)
+            self.create_multi_step_grid(c_values, base_values, alpha, output_path, dpi=dpi,
+                                        fig=grid_fig, axes=grid_axes)
+        if grid_fig is not None:
+            plt.close(grid_fig)
         
         # 2. Create step line comparisons for each parameter type
         # For c
         c_output_path = os.path.join(output_dir, "c_impact_across_steps.png")
-        self.create_step_line_comparison('c', c_values, output_path=c_output_path)
+        self.create_step_line_comparison('c', c_values, output_path=c_output_path, dpi=dpi)
         
         # For base
         base_output_path = os.path.join(output_dir, "base_impact_across_steps.png")
-        self.create_step_line_comparison('base', base_values, output_path=base_output_path)
+        self.create_step_line_comparison('base', base_values, output_path=base_output_path, dpi=dpi)
         
         # For alpha
         alpha_output_path = os.path.join(output_dir, "alpha_impact_across_steps.png")
-        self.create_step_line_comparison('alpha', alpha_values, output_path=alpha_output_path)
+        self.create_step_line_comparison('alpha', alpha_values, output_path=alpha_output_path, dpi=dpi)
         
         # 3. Create UCB distribution plots for steps 1-3
         max_step = min(self._get_max_step(), 3)
         for step in range(1, max_step + 1):
             ucb_output_path = os.path.join(output_dir, f"ucb_distribution_step_{step}.png")
-            self.create_ucb_distribution_plot(c_values[:3], 0.1, 0.05, step, ucb_output_path)
+            self.create_ucb_distribution_plot(c_values[:3], 0.1, 0.05, step, ucb_output_path, dpi=dpi)
             
         logger.info(f"All visualizations created and saved to {output_dir}")
 
@@ -527,6 +736,8 @@ if __name__ == "__main__":
     parser.add_argument("--output_dir", type=str, default="hyperparameter_analysis",
                       help="Directory to save visualization outputs")
     parser.add_argument("--file", type=str, help="Specific result file to analyze")
+    parser.add_argument("--dpi", type=int, default=150,
+                      help="Resolution of saved images (use 300 for publication figures)")
     args = parser.parse_args()
     
     # Setup logging
@@ -544,4 +755,4 @@ if __name__ == "__main__":
         logger.info(f"Loaded {num_files} files")
     
     # Create all visualizations
-    analyzer.create_all_visualizations(args.output_dir)
\ No newline at end of file
+    analyzer.create_all_visualizations(args.output_dir, dpi=args.dpi)
\ No newline at end of file
@@ -3,8 +3,35 @@ import logging
 from typing import Dict, List, Any, Optional
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+def read_json(file_path: str) -> Any:
+    """
+    Read a JSON file in one call and parse the bytes, raising on errors.
+    
+    orjson is used when it is installed; json parses what orjson rejects, such
+    as the NaN and Infinity tokens json.dump writes.
+    
+    Args:
+        file_path: Path to the JSON file
+        
+    Returns:
+        Parsed JSON value
+    """
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
 def load_json(file_path: str) -> Dict[str, Any]:
     """
     Load JSON from a file.
@@ -16,9 +43,7 @@ def load_json(file_path: str) -> Dict[str, Any]:
         Loaded JSON as a dictionary
     """
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return data
+        return read_json(file_path)
     except Exception as e:
         logger.error(f"Error loading JSON from {file_path}: {e}")
         return {}
@@ -51,6 +76,29 @@ def save_json(data: Dict[str, Any], file_path: str, pretty: bool = True) -> bool
         logger.error(f"Error saving JSON to {file_path}: {e}")
         return False
 
+def hashable_key(value: Any) -> Any:
+    """
+    Build a hashable key for JSON-like data (dicts, lists, tuples and scalars).
+    
+    Container and value types are part of the key, so a tuple and a list with the
+    same items (or 1, 1.0 and True) don't collide the way their JSON encodings do.
+    
+    Args:
+        value: Data to build a key for
+        
+    Returns:
+        Nested tuples that compare equal only for data of the same shape and types
+        
+    Raises:
+        TypeError: If a value is unhashable or a dict's keys can't be sorted
+    """
+    if isinstance(value, dict):
+        return (dict, tuple(sorted((k, hashable_key(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(hashable_key(v) for v in value))
+    hash(value)
+    return (type(value), value)
+
 def merge_json_objects(obj1: Dict[str, Any], obj2: Dict[str, Any]) -> Dict[str, Any]:
     """
     Merge two JSON objects.
@@ -64,11 +112,19 @@ def merge_json_objects(obj1: Dict[str, Any], obj2: Dict[str, Any]) -> Dict[str,
     """
     result = obj1.copy()
     
-    for key, value in obj2.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = merge_json_objects(result[key], value)
-        else:
-            result[key] = value
+    # Walk both trees with an explicit stack; only dicts present on both sides
+    # are copied (so obj1 is never mutated), everything else is assigned as-is
+    stack = [(result, obj2)]
+    while stack:
+        target, source = stack.pop()
+        for key, value in source.items():
+            existing = target.get(key)
+            if isinstance(existing, dict) and isinstance(value, dict):
+                merged = existing.copy()
+                target[key] = merged
+                stack.append((merged, value))
+            else:
+                target[key] = value
     
     return result
 
@@ -28,11 +28,21 @@ def setup_logger(
     # Create formatter
     formatter = logging.Formatter(format_str)
     
+    # Reuse handlers from earlier calls so repeated setup doesn't duplicate output
+    console_handler = None
+    file_paths = {}
+    for handler in logger.handlers:
+        if isinstance(handler, logging.FileHandler):
+            file_paths[handler.baseFilename] = handler
+        elif isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+            console_handler = handler
+    
     # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
+    if console_handler is None:
+        console_handler = logging.StreamHandler(sys.stdout)
+        logger.addHandler(console_handler)
     console_handler.setLevel(level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
     
     # Create file handler if log_file is provided
     if log_file:
@@ -40,10 +50,12 @@ def setup_logger(
         log_dir = os.path.dirname(log_file)
         if log_dir:
             os.makedirs(log_dir, exist_ok=True)
-            
-        file_handler = logging.FileHandler(log_file)
+        
+        file_handler = file_paths.get(os.path.abspath(log_file))
+        if file_handler is None:
+            file_handler = logging.FileHandler(log_file)
+            logger.addHandler(file_handler)
         file_handler.setLevel(level)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
     
-    return logger
\ No newline at end of file
+    return logger
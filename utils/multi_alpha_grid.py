@@ -7,24 +7,31 @@ Contains multiple visualization modes including:
 """
 
 import os
-import json
 import glob
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import matplotlib.pyplot as plt
 from typing import Dict, List, Any, Optional, Tuple
 import logging
+from functools import lru_cache
 import seaborn as sns
 from matplotlib.colors import LinearSegmentedColormap
 from mpl_toolkits.mplot3d import Axes3D
 
+try:
+    from utils.json_utils import read_json
+    from utils.plotting import save_figure
+except ImportError:
+    # Run as a script from inside utils/
+    from json_utils import read_json
+    from plotting import save_figure
+
 logger = logging.getLogger(__name__)
 
 def load_simulation_data(file_path: str) -> Dict[str, Any]:
     """Load a single simulation result file."""
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            return data
+        return read_json(file_path)
     except Exception as e:
         logger.error(f"Error loading {file_path}: {e}")
         return {}
@@ -35,14 +42,15 @@ def load_simulation_results(results_dir: str, file_pattern: str = "*.json") -> L
     files = glob.glob(pattern)
     results = []
     
-    for file_path in files:
-        try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                results.append(data)
+    # Read and parse files concurrently; results keep the glob order
+    with ThreadPoolExecutor(max_workers=max(1, min(32, len(files)))) as executor:
+        futures = [executor.submit(read_json, file_path) for file_path in files]
+        for file_path, future in zip(files, futures):
+            try:
+                results.append(future.result())
                 logger.debug(f"Loaded {file_path}")
-        except Exception as e:
-            logger.error(f"Error loading {file_path}: {e}")
+            except Exception as e:
+                logger.error(f"Error loading {file_path}: {e}")
     
     logger.info(f"Loaded {len(results)} simulation files from {results_dir}")
     return results
@@ -67,51 +75,225 @@ def _calculate_threshold(base: float, alpha: float, step_idx: int) -> float:
 
 def _get_questions_by_step(data: Dict[str, Any]) -> Dict[int, List[Dict[str, Any]]]:
     """Group questions by step based on question_id patterns."""
-    questions_by_step = {}
-    step = 0
-    
     # Process questions
     questions = data.get("questions", [])
     
     if not questions:
         return {}
+    
+    # Each q_0 question opens a new step; questions before the first one are skipped
+    step_starts = np.flatnonzero(np.fromiter(
+        (q.get("question_id", "").startswith("q_0") for q in questions),
+        dtype=bool, count=len(questions)
+    )).tolist()
+    bounds = step_starts + [len(questions)]
+    return {
+        step: questions[bounds[step - 1]:bounds[step]]
+        for step in range(1, len(step_starts) + 1)
+    }
+
+def _build_question_table(grouped: List[Dict[int, List[Dict[str, Any]]]]) -> Dict[str, np.ndarray]:
+    """
+    Flatten every grouped question into a structure-of-arrays table.
+    
+    Args:
+        grouped: Questions grouped by step for each simulation (from _group_simulations)
         
-    for q in questions:
-        q_id = q.get("question_id", "")
+    Returns:
+        Dictionary of equal-length arrays, one entry per question, ordered by
+        simulation then step: 'evpi', 'regret_reduction', 'exploration' (the
+        exploration term as in _recalculate_ucb), 'sim_id' and 'step_id'
+    """
+    evpi_values, regret_values, ucb_values, sim_ids, step_ids = [], [], [], [], []
+    for sim_id, questions_by_step in enumerate(grouped):
+        for step, step_questions in questions_by_step.items():
+            for q in step_questions:
+                metrics = q.get("metrics", {})
+                evpi_values.append(metrics.get("evpi", 0))
+                regret_values.append(metrics.get("regret_reduction", 0))
+                ucb_values.append(metrics.get("ucb_score", 0))
+                sim_ids.append(sim_id)
+                step_ids.append(step)
+    
+    evpi = np.array(evpi_values, dtype=float)
+    regret_reduction = np.array(regret_values, dtype=float)
+    return {
+        "evpi": evpi,
+        "regret_reduction": regret_reduction,
+        # Assuming original c=1.0, as in _recalculate_ucb
+        "exploration": np.array(ucb_values, dtype=float) - evpi - regret_reduction,
+        "sim_id": np.array(sim_ids, dtype=np.intp),
+        "step_id": np.array(step_ids, dtype=np.intp),
+    }
+
+def _step_columns(table: Dict[str, np.ndarray],
+                  step: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Select the UCB components of every question at a step.
+    
+    Args:
+        table: Question table from _build_question_table
+        step: Clarification step to select
         
-        # Detect new step by looking for q_0 pattern
-        if q_id.startswith("q_0"):
-            step += 1
-            questions_by_step[step] = []
-            
-        # Make sure we have a valid step
-        if step > 0:
-            if step not in questions_by_step:
-                questions_by_step[step] = []
-            questions_by_step[step].append(q)
+    Returns:
+        Tuple of (evpi + regret_reduction, exploration term, index of each
+        question's simulation among the simulations that reached the step);
+        questions of a simulation are contiguous
+    """
+    mask = table["step_id"] == step
+    evpi_rr = table["evpi"][mask] + table["regret_reduction"][mask]
+    sim_index = np.cumsum(np.diff(table["sim_id"][mask], prepend=-1) != 0) - 1
+    return evpi_rr, table["exploration"][mask], sim_index
+
+def _step_ucb_matrix(table: Dict[str, np.ndarray], step: int,
+                     c_arr: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Recalculate the UCB of every question at a step for every c.
+    
+    Args:
+        table: Question table from _build_question_table
+        step: Clarification step to select
+        c_arr: Exploration constants
+        
+    Returns:
+        Tuple of (UCB scores of shape (len(c_arr), n_questions), index of each
+        simulation's first question); questions of a simulation are contiguous
+    """
+    evpi_rr, exploration, sim_index = _step_columns(table, step)
+    ucb = evpi_rr[None, :] + c_arr[:, None] * exploration[None, :]
+    sim_starts = np.flatnonzero(np.diff(sim_index, prepend=-1))
+    return ucb, sim_starts
+
+@lru_cache(maxsize=None)
+def _count_exceed_kernel():
+    """
+    Compile the threshold-exceedance counting kernel with numba on first use, so
+    sweeps that don't ask for numba never import it.
+    
+    Returns:
+        The compiled kernel, or None if numba is not installed
+    """
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+    
+    @njit(parallel=True, cache=True)
+    def count_exceed(evpi_rr, exploration, c_arr, thresholds, sim_index, n_sims):
+        """Count questions, and simulations with any question, whose UCB exceeds each threshold."""
+        counts = np.zeros((c_arr.shape[0], thresholds.shape[0]), dtype=np.int64)
+        sims = np.zeros((c_arr.shape[0], thresholds.shape[0]), dtype=np.int64)
+        for c_idx in prange(c_arr.shape[0]):
+            c = c_arr[c_idx]
+            seen = np.zeros((thresholds.shape[0], n_sims), dtype=np.uint8)
+            for i in range(evpi_rr.shape[0]):
+                ucb = evpi_rr[i] + c * exploration[i]
+                for t_idx in range(thresholds.shape[0]):
+                    if ucb > thresholds[t_idx]:
+                        counts[c_idx, t_idx] += 1
+                        if seen[t_idx, sim_index[i]] == 0:
+                            seen[t_idx, sim_index[i]] = 1
+                            sims[c_idx, t_idx] += 1
+        return counts, sims
+    
+    return count_exceed
+
+def _count_above(sorted_rows: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """
+    Count the values strictly above each threshold in every row of a row-sorted array.
+    
+    Args:
+        sorted_rows: Array of shape (n_rows, n_values), sorted along axis 1
+        thresholds: Thresholds to compare against
+        
+    Returns:
+        Integer array of shape (n_rows, len(thresholds))
+    """
+    # NaNs sort last and never exceed a threshold, so count only the values before them
+    n_valid = np.count_nonzero(~np.isnan(sorted_rows), axis=1)
+    counts = [n - np.searchsorted(row, thresholds, side='right')
+              for row, n in zip(sorted_rows, n_valid)]
+    return np.array(counts, dtype=np.intp).reshape(len(sorted_rows), len(thresholds))
+
+def _sorted_step_scores(ucb: np.ndarray,
+                        sim_starts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sort a step's UCB scores, and each simulation's highest score, for every c.
+    
+    Neither depends on alpha or base, so they are computed once per step and
+    reused for every threshold sweep.
+    
+    Args:
+        ucb: UCB scores of shape (len(c_values), n_questions), with each
+            simulation's questions stored contiguously
+        sim_starts: Index of each simulation's first question in ucb
+        
+    Returns:
+        Tuple of (UCB scores sorted along axis 1, per-simulation maximum UCB of
+        shape (len(c_values), n_sims) sorted along axis 1)
+    """
+    if ucb.shape[1] == 0:
+        return ucb, np.zeros((ucb.shape[0], 0))
+    
+    # A simulation has a question above a threshold exactly when its highest
+    # UCB is; a simulation that reached a step has at least its q_0 question
+    # there, so no reduceat segment is empty
+    sim_max = np.fmax.reduceat(ucb, sim_starts, axis=1)
+    return np.sort(ucb, axis=1), np.sort(sim_max, axis=1)
+
+def _exceedance_heatmaps(sorted_ucb: np.ndarray, sorted_sim_max: np.ndarray,
+                         thresholds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute both threshold-exceedance heatmaps for every (c, base) pair.
+    
+    Instead of comparing every question against every threshold, the thresholds
+    are located by binary search in the sorted scores, so memory stays
+    O(C * n_questions) however many base values are swept.
     
-    return questions_by_step
+    Args:
+        sorted_ucb: Sorted UCB scores from _sorted_step_scores
+        sorted_sim_max: Sorted per-simulation maximum UCB from _sorted_step_scores
+        thresholds: Dynamic threshold per base value
+        
+    Returns:
+        Tuple of (mean proportion of questions exceeding the threshold,
+        percentage of simulations with at least one question exceeding it),
+        each of shape (len(c_values), len(thresholds))
+    """
+    n_c, n_questions = sorted_ucb.shape
+    if n_questions == 0:
+        return np.zeros((n_c, len(thresholds))), np.zeros((n_c, len(thresholds)))
+    
+    mean_proportion = _count_above(sorted_ucb, thresholds) / n_questions
+    sims_exceeding = _count_above(sorted_sim_max, thresholds)
+    has_question_percent = sims_exceeding / sorted_sim_max.shape[1] * 100
+    return mean_proportion, has_question_percent
+
+def _group_simulations(simulation_data: List[Dict[str, Any]]) -> List[Dict[int, List[Dict[str, Any]]]]:
+    """Group the questions of every simulation by step, once per simulation."""
+    return [_get_questions_by_step(data) for data in simulation_data]
 
-def _get_max_step(simulation_data: List[Dict[str, Any]]) -> int:
-    """Get the maximum step number found in the data."""
+def _get_max_step(simulation_data: List[Dict[str, Any]],
+                  grouped: Optional[List[Dict[int, List[Dict[str, Any]]]]] = None) -> int:
+    """Get the maximum step number found in the data (reusing grouped when given)."""
+    if grouped is None:
+        grouped = _group_simulations(simulation_data)
     max_step = 0
-    for data in simulation_data:
-        steps = _get_questions_by_step(data)
+    for steps in grouped:
         if steps:
             max_step = max(max_step, max(steps.keys()))
     return max_step
 
-def create_multi_alpha_grid(
+def _compute_exceedance_grids(
     simulation_data: List[Dict[str, Any]],
     c_values: List[float],
     base_values: List[float],
     alpha_values: List[float],
     max_steps: int = 4,
-    output_path: Optional[str] = None,
-    mode: str = "mean_proportion"
-) -> None:
+    use_numba: bool = False
+) -> Optional[Dict[str, np.ndarray]]:
     """
-    Create a comprehensive visualization showing parameter impact for all alpha values.
+    Compute both visualization metrics for every (step, alpha, c, base) combination.
     
     Args:
         simulation_data: List of loaded simulation data dictionaries
@@ -119,20 +301,130 @@ def create_multi_alpha_grid(
         base_values: List of base threshold values to test
         alpha_values: List of alpha values to test
         max_steps: Maximum number of steps to visualize
-        output_path: Path to save the visualization
-        mode: Visualization mode ('mean_proportion' or 'has_question_percent')
+        use_numba: Count exceedances with a compiled numba kernel instead of
+            sorting, avoiding temporaries on very large sweeps
+        
+    Returns:
+        Dictionary mapping 'mean_proportion' and 'has_question_percent' to arrays
+        of shape (n_steps, len(alpha_values), len(c_values), len(base_values)),
+        where n_steps is max_steps capped at the deepest step in the data, or
+        None if there is nothing to visualize
     """
     if not simulation_data:
         logger.error("No simulation data provided")
-        return
+        return None
+    
+    # Group every simulation's questions by step once
+    grouped = _group_simulations(simulation_data)
     
     # Get actual max step from data
-    data_max_step = _get_max_step(simulation_data)
+    data_max_step = _get_max_step(simulation_data, grouped)
     max_steps = min(data_max_step, max_steps)
     
     if max_steps == 0:
         logger.error("No question steps found in data")
-        return
+        return None
+    
+    if use_numba and _count_exceed_kernel() is None:
+        logger.warning("numba is not installed; falling back to NumPy for threshold sweeps")
+        use_numba = False
+    
+    shape = (max_steps, len(alpha_values), len(c_values), len(base_values))
+    grids = {"mean_proportion": np.zeros(shape), "has_question_percent": np.zeros(shape)}
+    
+    # UCB of every question at each step for every c, pooled across simulations,
+    # plus where each simulation's questions start; none of it depends on alpha or base
+    c_arr = np.asarray(c_values, dtype=float)
+    table = _build_question_table(grouped)
+    
+    # Dynamic threshold for every (alpha, step, base) combination at once
+    step_thresholds = _calculate_threshold(
+        np.asarray(base_values, dtype=float)[None, None, :],
+        np.asarray(alpha_values, dtype=float)[:, None, None],
+        np.arange(max_steps)[None, :, None])
+    
+    for step_idx, step in enumerate(range(1, max_steps + 1)):
+        if use_numba:
+            evpi_rr, exploration, sim_index = _step_columns(table, step)
+            n_questions = len(evpi_rr)
+            n_sims = int(sim_index[-1]) + 1 if n_questions else 0
+        else:
+            sorted_ucb, sorted_sim_max = _sorted_step_scores(
+                *_step_ucb_matrix(table, step, c_arr))
+        
+        for alpha_idx in range(len(alpha_values)):
+            # Both heatmaps for every (c, base) pair from one exceedance pass
+            thresholds = step_thresholds[alpha_idx, step_idx]
+            if not use_numba:
+                (grids["mean_proportion"][step_idx, alpha_idx],
+                 grids["has_question_percent"][step_idx, alpha_idx]) = _exceedance_heatmaps(
+                    sorted_ucb, sorted_sim_max, thresholds)
+            elif n_questions:
+                counts, sims = _count_exceed_kernel()(evpi_rr, exploration, c_arr,
+                                                      thresholds, sim_index, n_sims)
+                grids["mean_proportion"][step_idx, alpha_idx] = counts / n_questions
+                grids["has_question_percent"][step_idx, alpha_idx] = sims / n_sims * 100
+    
+    return grids
+
+def create_multi_alpha_grid(
+    simulation_data: List[Dict[str, Any]],
+    c_values: List[float],
+    base_values: List[float],
+    alpha_values: List[float],
+    max_steps: int = 4,
+    output_path: Optional[str] = None,
+    mode: str = "mean_proportion",
+    grids: Optional[Dict[str, np.ndarray]] = None,
+    use_numba: bool = False,
+    dpi: int = 300
+) -> None:
+    """
+    Create a comprehensive visualization showing parameter impact for all alpha values.
+    
+    Args:
+        simulation_data: List of loaded simulation data dictionaries
+        c_values: List of exploration constant values to test
+        base_values: List of base threshold values to test
+        alpha_values: List of alpha values to test
+        max_steps: Maximum number of steps to visualize
+        output_path: Path to save the visualization
+        mode: Visualization mode ('mean_proportion' or 'has_question_percent')
+        grids: Precomputed metrics from _compute_exceedance_grids, to share one
+            computation across several renderings
+        use_numba: Count exceedances with numba when computing the metrics
+        dpi: Resolution of the saved image
+    """
+    if grids is None:
+        grids = _compute_exceedance_grids(simulation_data, c_values, base_values,
+                                          alpha_values, max_steps, use_numba)
+        if grids is None:
+            return
+    
+    _render_heatmap(grids[mode], mode, c_values, base_values, alpha_values, output_path, dpi)
+
+def _render_heatmap(
+    heatmaps: np.ndarray,
+    mode: str,
+    c_values: List[float],
+    base_values: List[float],
+    alpha_values: List[float],
+    output_path: Optional[str] = None,
+    dpi: int = 300
+) -> None:
+    """
+    Draw one metric as a grid of heatmaps, one row per alpha and one column per step.
+    
+    Args:
+        heatmaps: Metric of shape (n_steps, len(alpha_values), len(c_values), len(base_values))
+        mode: Visualization mode ('mean_proportion' or 'has_question_percent')
+        c_values: List of exploration constant values tested
+        base_values: List of base threshold values tested
+        alpha_values: List of alpha values tested
+        output_path: Path to save the visualization
+        dpi: Resolution of the saved image
+    """
+    max_steps = heatmaps.shape[0]
     
     # Set up title and colorbar label based on mode
     if mode == "mean_proportion":
@@ -157,94 +449,24 @@ def create_multi_alpha_grid(
     for alpha_idx, alpha in enumerate(alpha_values):
         for step_idx, step in enumerate(range(1, max_steps + 1)):
             ax = axes[alpha_idx, step_idx]
-            
-            # Create heatmap data for this alpha-step combination
-            heatmap_data = np.zeros((len(c_values), len(base_values)))
-            
-            # Calculate values for each c-base combination
-            for c_idx, c in enumerate(c_values):
-                for base_idx, base in enumerate(base_values):
-                    # Calculate dynamic threshold
-                    threshold = _calculate_threshold(base, alpha, step - 1)
-                    
-                    if mode == "mean_proportion":
-                        # Count questions exceeding threshold
-                        questions_exceeding = 0
-                        total_questions = 0
-                        
-                        # Process each simulation
-                        for data in simulation_data:
-                            questions_by_step = _get_questions_by_step(data)
-                            
-                            if step in questions_by_step:
-                                step_questions = questions_by_step[step]
-                                total_questions += len(step_questions)
-                                
-                                # Check each question
-                                for q in step_questions:
-                                    ucb = _recalculate_ucb(q, c)
-                                    if ucb > threshold:
-                                        questions_exceeding += 1
-                        
-                        # Calculate proportion
-                        if total_questions > 0:
-                            value = questions_exceeding / total_questions
-                        else:
-                            value = 0
-                    
-                    else:  # has_question_percent mode
-                        # Count simulations with at least one question exceeding threshold
-                        sims_with_questions = 0
-                        total_sims_with_step = 0
-                        
-                        # Process each simulation
-                        for data in simulation_data:
-                            questions_by_step = _get_questions_by_step(data)
-                            
-                            if step in questions_by_step:
-                                total_sims_with_step += 1
-                                step_questions = questions_by_step[step]
-                                
-                                # Check if any question exceeds threshold
-                                has_question_exceeding = False
-                                for q in step_questions:
-                                    ucb = _recalculate_ucb(q, c)
-                                    if ucb > threshold:
-                                        has_question_exceeding = True
-                                        break
-                                
-                                if has_question_exceeding:
-                                    sims_with_questions += 1
-                        
-                        # Calculate percentage
-                        if total_sims_with_step > 0:
-                            value = sims_with_questions / total_sims_with_step * 100
-                        else:
-                            value = 0
-                    
-                    heatmap_data[c_idx, base_idx] = value
+            heatmap_data = heatmaps[step_idx, alpha_idx]
             
             # Create heatmap - adjust vmax based on mode
             vmax = 1.0 if mode == "mean_proportion" else 100.0
             im = ax.imshow(heatmap_data, cmap='viridis', origin='lower', vmin=0, vmax=vmax, aspect='auto')
             
-            # Add text annotations
-            for c_idx in range(len(c_values)):
-                for base_idx in range(len(base_values)):
-                    value = heatmap_data[c_idx, base_idx]
-                    
-                    # Format value text based on mode
-                    if mode == "mean_proportion":
-                        value_text = f'{value:.2f}'
-                    else:  # has_question_percent mode
-                        value_text = f'{value:.0f}%'
-                    
-                    # Determine text color - adjust threshold based on mode
-                    threshold = 0.5 if mode == "mean_proportion" else 50
-                    text_color = 'white' if value > threshold else 'black'
-                    
-                    ax.text(base_idx, c_idx, value_text, 
-                           ha='center', va='center', color=text_color, fontsize=8)
+            # Add text annotations - labels and colors for the whole heatmap at once,
+            # with the color threshold adjusted based on mode
+            if mode == "mean_proportion":
+                value_texts = np.char.mod('%.2f', heatmap_data)
+                text_colors = np.where(heatmap_data > 0.5, 'white', 'black')
+            else:  # has_question_percent mode
+                value_texts = np.char.mod('%.0f%%', heatmap_data)
+                text_colors = np.where(heatmap_data > 50, 'white', 'black')
+            
+            for (c_idx, base_idx), value_text in np.ndenumerate(value_texts):
+                ax.text(base_idx, c_idx, value_text, 
+                       ha='center', va='center', color=text_colors[c_idx, base_idx], fontsize=8)
             
             # Set axes labels and ticks
             if step_idx == 0:  # First column
@@ -273,7 +495,7 @@ def create_multi_alpha_grid(
     
     # Save or show
     if output_path:
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        save_figure(output_path, dpi)
         plt.close()
         logger.info(f"Saved multi-alpha grid visualization to {output_path}")
     else:
@@ -285,7 +507,10 @@ def create_alternative_visualization(
     base_values: List[float],
     alpha_values: List[float],
     max_steps: int = 4,
-    output_path: Optional[str] = None
+    output_path: Optional[str] = None,
+    grids: Optional[Dict[str, np.ndarray]] = None,
+    use_numba: bool = False,
+    dpi: int = 300
 ) -> None:
     """
     Create an alternative visualization showing all dimensions of the data.
@@ -298,18 +523,17 @@ def create_alternative_visualization(
         alpha_values: List of alpha values to test
         max_steps: Maximum number of steps to visualize
         output_path: Path to save the visualization
+        grids: Precomputed metrics from _compute_exceedance_grids, to share one
+            computation across several renderings
+        use_numba: Count exceedances with numba when computing the metrics
+        dpi: Resolution of the saved image
     """
-    if not simulation_data:
-        logger.error("No simulation data provided")
-        return
-    
-    # Get actual max step from data
-    data_max_step = _get_max_step(simulation_data)
-    max_steps = min(data_max_step, max_steps)
-    
-    if max_steps == 0:
-        logger.error("No question steps found in data")
-        return
+    if grids is None:
+        grids = _compute_exceedance_grids(simulation_data, c_values, base_values,
+                                          alpha_values, max_steps, use_numba)
+        if grids is None:
+            return
+    max_steps = grids["mean_proportion"].shape[0]
     
     # We'll use a bubble chart with grid layout
     fig = plt.figure(figsize=(15, 12))
@@ -318,63 +542,9 @@ def create_alternative_visualization(
     # This is the inverse of the previous visualization
     n_rows, n_cols = max_steps, len(alpha_values)
     
-    # Calculate the data first - for all parameter combinations and metrics
-    all_data = {}
-    
-    # First, gather all data values
-    for step in range(1, max_steps + 1):
-        all_data[step] = {}
-        
-        for alpha_idx, alpha in enumerate(alpha_values):
-            all_data[step][alpha] = {}
-            
-            for c in c_values:
-                all_data[step][alpha][c] = {}
-                
-                for base in base_values:
-                    # Calculate dynamic threshold
-                    threshold = _calculate_threshold(base, alpha, step - 1)
-                    
-                    # Calculate both metrics
-                    # 1. Mean proportion of questions exceeding threshold
-                    questions_exceeding = 0
-                    total_questions = 0
-                    
-                    # 2. Percentage of simulations with at least one question
-                    sims_with_questions = 0
-                    total_sims_with_step = 0
-                    
-                    # Process each simulation
-                    for data in simulation_data:
-                        questions_by_step = _get_questions_by_step(data)
-                        
-                        if step in questions_by_step:
-                            step_questions = questions_by_step[step]
-                            total_questions += len(step_questions)
-                            
-                            # For second metric
-                            total_sims_with_step += 1
-                            has_question_exceeding = False
-                            
-                            # Check each question
-                            for q in step_questions:
-                                ucb = _recalculate_ucb(q, c)
-                                if ucb > threshold:
-                                    questions_exceeding += 1
-                                    has_question_exceeding = True
-                            
-                            if has_question_exceeding:
-                                sims_with_questions += 1
-                    
-                    # Calculate metrics
-                    mean_proportion = questions_exceeding / total_questions if total_questions > 0 else 0
-                    has_question_percent = sims_with_questions / total_sims_with_step * 100 if total_sims_with_step > 0 else 0
-                    
-                    # Store results
-                    all_data[step][alpha][c][base] = {
-                        "mean_proportion": mean_proportion,
-                        "has_question_percent": has_question_percent
-                    }
+    # Both metrics for all parameter combinations, indexed [step, alpha, c, base]
+    mean_prop = grids["mean_proportion"]
+    has_pct = grids["has_question_percent"]
 
     # Create radar chart
     # We'll use step, alpha, c, base as the axes
@@ -387,22 +557,10 @@ def create_alternative_visualization(
     grid = plt.GridSpec(max_steps, len(alpha_values), wspace=0.4, hspace=0.3)
     
     # Find min/max values for consistent bubble sizing
-    min_prop = 1.0
-    max_prop = 0.0
-    min_percent = 100.0
-    max_percent = 0.0
-    
-    for step in all_data:
-        for alpha in all_data[step]:
-            for c in all_data[step][alpha]:
-                for base in all_data[step][alpha][c]:
-                    values = all_data[step][alpha][c][base]
-                    
-                    min_prop = min(min_prop, values["mean_proportion"])
-                    max_prop = max(max_prop, values["mean_proportion"])
-                    
-                    min_percent = min(min_percent, values["has_question_percent"])
-                    max_percent = max(max_percent, values["has_question_percent"])
+    min_prop = mean_prop.min(initial=1.0)
+    max_prop = mean_prop.max(initial=0.0)
+    min_percent = has_pct.min(initial=100.0)
+    max_percent = has_pct.max(initial=0.0)
     
     # Make sure we don't divide by zero
     if min_prop == max_prop:
@@ -410,41 +568,40 @@ def create_alternative_visualization(
     if min_percent == max_percent:
         max_percent = min_percent + 10
     
+    # Coordinates of every (c, base) point, in the same order as the flattened metrics
+    c_mesh, base_mesh = np.meshgrid(c_values, base_values, indexing='ij')
+    c_grid, base_grid = c_mesh.ravel(), base_mesh.ravel()
+    
     # Create plots
     for step_idx, step in enumerate(range(1, max_steps + 1)):
         for alpha_idx, alpha in enumerate(alpha_values):
             # Create subplot
             ax = plt.subplot(grid[step_idx, alpha_idx])
             
-            # For each c-base combination, plot a point
-            for c_idx, c in enumerate(c_values):
-                for base_idx, base in enumerate(base_values):
-                    values = all_data[step][alpha][c][base]
-                    
-                    # Get metrics
-                    mean_prop = values["mean_proportion"]
-                    has_percent = values["has_question_percent"]
-                    
-                    # Normalize for bubble size and color
-                    norm_prop = (mean_prop - min_prop) / (max_prop - min_prop)
-                    norm_percent = (has_percent - min_percent) / (max_percent - min_percent)
-                    
-                    # Calculate bubble size - based on has_question_percent
-                    # Min size 20, max size 500
-                    size = 20 + 480 * norm_percent
-                    
-                    # Get color based on mean_proportion
-                    color = cmap(norm_prop)
-                    
-                    # Plot bubble
-                    ax.scatter(c, base, s=size, color=color, alpha=0.7, 
-                              edgecolor='black', linewidth=1)
-                    
-                    # Add percentage text for larger bubbles
-                    if size > 100:
-                        ax.text(c, base, f"{has_percent:.0f}%", 
-                               ha='center', va='center', fontsize=8, 
-                               color='white' if norm_prop > 0.5 else 'black')
+            # Plot a point for every c-base combination in one call
+            point_props = mean_prop[step_idx, alpha_idx].ravel()
+            has_percents = has_pct[step_idx, alpha_idx].ravel()
+            
+            # Normalize for bubble size and color
+            norm_props = (point_props - min_prop) / (max_prop - min_prop)
+            norm_percents = (has_percents - min_percent) / (max_percent - min_percent)
+            
+            # Calculate bubble size - based on has_question_percent
+            # Min size 20, max size 500
+            sizes = 20 + 480 * norm_percents
+            
+            # Plot bubbles, colored based on mean_proportion
+            ax.scatter(c_grid, base_grid, s=sizes, c=cmap(norm_props), alpha=0.7, 
+                      edgecolor='black', linewidth=1)
+            
+            # Add percentage text for larger bubbles - labels and colors for all
+            # points at once, then one pass over the points large enough to label
+            value_texts = np.char.mod('%.0f%%', has_percents)
+            text_colors = np.where(norm_props > 0.5, 'white', 'black')
+            for point_idx in np.flatnonzero(sizes > 100):
+                ax.text(c_grid[point_idx], base_grid[point_idx], value_texts[point_idx], 
+                       ha='center', va='center', fontsize=8, 
+                       color=text_colors[point_idx])
             
             # Set labels and title
             if step_idx == max_steps - 1:  # Bottom row
@@ -463,9 +620,11 @@ def create_alternative_visualization(
             ax.grid(True, linestyle='--', alpha=0.5)
     
     # Add color bar for mean proportion
+    # on its own axes, like the heatmap grids, so no subplot has to be resized for it
     sm = plt.cm.ScalarMappable(cmap=cmap, norm=plt.Normalize(0, 1))
     sm.set_array([])
-    cbar = plt.colorbar(sm, ax=plt.gcf().get_axes())
+    cbar_ax = fig.add_axes([0.92, 0.15, 0.02, 0.7])
+    cbar = fig.colorbar(sm, cax=cbar_ax)
     cbar.set_label('Mean proportion of questions exceeding threshold')
     
     # Add size legend
@@ -490,11 +649,11 @@ def create_alternative_visualization(
                 fontsize=16)
     
     # Adjust layout
-    plt.tight_layout(rect=[0, 0, 1, 0.95])
+    plt.tight_layout(rect=[0, 0, 0.9, 0.95])
     
     # Save or show
     if output_path:
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        save_figure(output_path, dpi)
         plt.close()
         logger.info(f"Saved alternative visualization to {output_path}")
     else:
@@ -506,7 +665,9 @@ def visualize_all(
     base_values: List[float],
     alpha_values: List[float],
     output_dir: str,
-    max_steps: int = 4
+    max_steps: int = 4,
+    use_numba: bool = False,
+    dpi: int = 150
 ) -> None:
     """
     Create all three visualizations:
@@ -521,6 +682,9 @@ def visualize_all(
         alpha_values: List of alpha values to test
         output_dir: Directory to save visualizations
         max_steps: Maximum number of steps to visualize
+        use_numba: Count exceedances with a compiled numba kernel (worth the
+            compile time only for large sweeps)
+        dpi: Resolution of the saved images (use 300 for publication figures)
     """
     # Create output directory if needed
     os.makedirs(output_dir, exist_ok=True)
@@ -532,6 +696,12 @@ def visualize_all(
         logger.error(f"No simulation data found in {results_dir}")
         return
     
+    # Compute both metrics once and share them between all three visualizations
+    grids = _compute_exceedance_grids(simulation_data, c_values, base_values,
+                                      alpha_values, max_steps, use_numba)
+    if grids is None:
+        return
+    
     # 1. Mean proportion grid
     mean_output_path = os.path.join(output_dir, "mean_proportion_grid.png")
     create_multi_alpha_grid(
@@ -541,7 +711,9 @@ def visualize_all(
         alpha_values=alpha_values,
         max_steps=max_steps,
         output_path=mean_output_path,
-        mode="mean_proportion"
+        mode="mean_proportion",
+        grids=grids,
+        dpi=dpi
     )
     
     # 2. Has question percentage grid
@@ -553,7 +725,9 @@ def visualize_all(
         alpha_values=alpha_values,
         max_steps=max_steps,
         output_path=percent_output_path,
-        mode="has_question_percent"
+        mode="has_question_percent",
+        grids=grids,
+        dpi=dpi
     )
     
     # 3. Alternative visualization
@@ -564,7 +738,9 @@ def visualize_all(
         base_values=base_values,
         alpha_values=alpha_values,
         max_steps=max_steps,
-        output_path=alt_output_path
+        output_path=alt_output_path,
+        grids=grids,
+        dpi=dpi
     )
     
     logger.info(f"All visualizations created and saved to {output_dir}")
@@ -588,6 +764,8 @@ if __name__ == "__main__":
                         help="Alpha values to visualize")
     parser.add_argument("--max_steps", type=int, default=4,
                         help="Maximum number of steps to visualize")
+    parser.add_argument("--dpi", type=int, default=150,
+                        help="Resolution of saved images (use 300 for publication figures)")
     parser.add_argument("--verbose", action="store_true",
                         help="Enable verbose logging")
     
@@ -605,5 +783,6 @@ if __name__ == "__main__":
         base_values=args.base_values,
         alpha_values=args.alpha_values,
         output_dir=args.output_dir,
-        max_steps=args.max_steps
+        max_steps=args.max_steps,
+        dpi=args.dpi
     )
\ No newline at end of file
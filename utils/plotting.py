@@ -0,0 +1,36 @@
+"""
+Shared figure output for the plotting scripts in utils.
+"""
+
+import os
+from typing import Optional
+
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+# Encoder options per output format: fast zlib compression for PNG and fast
+# lossy encoding for WebP; other formats use matplotlib's defaults
+_PIL_KWARGS = {
+    '.png': {'compress_level': 1},
+    '.webp': {'quality': 85, 'method': 0},
+}
+
+
+def save_figure(output_path: str, dpi: int = 300, fig: Optional[Figure] = None) -> None:
+    """
+    Save a figure with a tight bounding box.
+    
+    Args:
+        output_path: Path to save the figure to; its extension selects the format
+        dpi: Resolution of the saved image
+        fig: Figure to save (pyplot's current figure by default)
+    """
+    # Figure.savefig rather than plt.savefig, which re-renders the whole
+    # figure through canvas.draw_idle() after writing the file
+    if fig is None:
+        fig = plt.gcf()
+    pil_kwargs = _PIL_KWARGS.get(os.path.splitext(output_path)[1].lower())
+    if pil_kwargs is not None:
+        fig.savefig(output_path, dpi=dpi, bbox_inches='tight', pil_kwargs=pil_kwargs)
+    else:
+        fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
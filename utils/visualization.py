@@ -1,31 +1,263 @@
 import os
-import json
 import glob
+import pickle
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib import font_manager
 import matplotlib.gridspec as gridspec
 import matplotlib.patheffects as path_effects
+from matplotlib.collections import LineCollection
 import seaborn as sns
 from collections import defaultdict
 from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
 from matplotlib.ticker import MaxNLocator
 import math
+from functools import lru_cache
+from types import MappingProxyType
+
+try:
+    from utils.json_utils import read_json, save_json
+    from utils.plotting import save_figure
+except ImportError:
+    # Run as a script from inside utils/
+    from json_utils import read_json, save_json
+    from plotting import save_figure
+
+
+# Top-level result keys the visualizations read; everything else is dropped at load time
+_RESULT_KEYS = ("question_history", "arg_clarification_counts", "evaluation", "success", "turns")
+
+
+def _load_result(file_path: str) -> Dict[str, Any]:
+    """Load one result file, keeping only the _RESULT_KEYS the visualizations use."""
+    result = read_json(file_path)
+    return {key: result[key] for key in _RESULT_KEYS if key in result}
+
+
+# Shared read-only default for missing nested dicts, so lookups don't build a new {} each time
+_EMPTY = MappingProxyType({})
+
+# Per-question metrics aggregated per turn in visualize_metrics_over_turns
+_TURN_METRICS = ('evpi', 'regret_reduction', 'ucb_score', 'certainty')
+
+# From this many results on, turns vs. success is drawn as a 2D histogram instead of a jittered scatter
+_DENSITY_PLOT_MIN_POINTS = 1_000
+
+# Below this many questions numba's JIT warm-up costs more than the NumPy aggregation saves
+_NUMBA_MIN_QUESTIONS = 10_000
+
+# Per-question metrics plotted by target argument in visualize_question_metrics
+_QUESTION_METRICS = ('evpi', 'regret_reduction', 'ucb_score')
+
+# Longer certainty progressions are drawn from this many evenly spaced points, without markers
+_MAX_POINTS_PER_SIM = 500
+
+# visualize_all's visualizations, as (ResultsVisualizer method, output file name without extension)
+_ALL_VISUALIZATIONS = (
+    ("visualize_metrics_over_turns", "metrics_over_turns"),
+    ("visualize_certainty_progress", "certainty_progress"),
+    ("visualize_question_metrics", "question_metrics"),
+    ("visualize_arg_importance", "arg_importance"),
+    ("visualize_success_metrics", "success_metrics"),
+    ("visualize_turns_vs_success", "turns_vs_success"),
+    ("visualize_question_effectiveness", "question_effectiveness"),
+)
+
+# Output file name (without extension) of each visualize_* method
+_VISUALIZATION_FILE_NAMES = dict(_ALL_VISUALIZATIONS)
+
+# Output formats visualize_all and the CLI can write
+_OUTPUT_FORMATS = ("png", "svg", "webp")
+
+# File in each output directory mapping a saved visualization's file name to
+# the fingerprint of the result files it was drawn from
+_OUTPUTS_MANIFEST = ".visualization_inputs.json"
+
+# The CLI's --visualize choices for a single visualization, mapped to their ResultsVisualizer method
+_CLI_VISUALIZATIONS = {
+    "metrics": "visualize_metrics_over_turns",
+    "certainty": "visualize_certainty_progress",
+    "questions": "visualize_question_metrics",
+    "importance": "visualize_arg_importance",
+    "success": "visualize_success_metrics",
+    "turns": "visualize_turns_vs_success",
+    "effectiveness": "visualize_question_effectiveness",
+}
+
+
+@lru_cache(maxsize=None)
+def _viridis_palette(n_colors: int) -> np.ndarray:
+    """The RGB colors of sns.color_palette("viridis", n_colors), sampled from the colormap once per size."""
+    palette = plt.cm.viridis(np.linspace(0, 1, n_colors + 2)[1:-1])[:, :3]
+    palette.setflags(write=False)
+    return palette
+
+
+def _start_figure(fig: Optional[Figure], figsize: Tuple[float, float], **kwargs) -> None:
+    """
+    Make a figure of the given size pyplot's current figure, clearing and
+    resizing fig when one is passed instead of creating a new figure.
+    
+    Args:
+        fig: pyplot figure to reuse (optional)
+        figsize: Figure size in inches
+        **kwargs: Figure options for a new figure; only facecolor is applied to a reused one
+    """
+    if fig is None:
+        plt.figure(figsize=figsize, **kwargs)
+        return
+    
+    fig.clear()
+    fig.set_size_inches(figsize)
+    fig.set_facecolor(kwargs.get('facecolor', plt.rcParams['figure.facecolor']))
+    # Undo the margins the previous plot's tight_layout left behind
+    fig.subplots_adjust(**{key: plt.rcParams[f'figure.subplot.{key}']
+                           for key in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
+    plt.figure(fig.number)
+
+
+def _save_or_show(save_path: Optional[str], keep_open: bool = False) -> None:
+    """
+    Save the current figure and close it, or show it if there is no save path.
+    
+    Args:
+        save_path: Path to save the visualization (optional)
+        keep_open: Don't close the saved figure, because the caller reuses it
+    """
+    if save_path:
+        save_figure(save_path)
+        print(f"Visualization saved to {save_path}")
+        if not keep_open:
+            plt.close()
+    else:
+        plt.show()
+
+
+@lru_cache(maxsize=None)
+def _aggregate_by_turn_kernel():
+    """
+    Compile the per-turn aggregation kernel with numba on first use, so runs that
+    never reach _NUMBA_MIN_QUESTIONS don't pay for importing numba.
+    
+    Returns:
+        The compiled kernel, or None if numba is not installed
+    """
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+    
+    @njit(parallel=True, cache=True)
+    def aggregate(turn, values, n_turns):
+        """Per-turn mean, min and max of each row of values, one metric per thread."""
+        n_metrics = values.shape[0]
+        counts = np.zeros(n_turns, dtype=np.int64)
+        for i in range(turn.shape[0]):
+            counts[turn[i]] += 1
+        
+        sums = np.zeros((n_metrics, n_turns))
+        mins = np.full((n_metrics, n_turns), np.inf)
+        maxs = np.full((n_metrics, n_turns), -np.inf)
+        # Each metric's row is summed in question order, as in the NumPy path
+        for m in prange(n_metrics):
+            for i in range(turn.shape[0]):
+                t = turn[i]
+                v = values[m, i]
+                sums[m, t] += v
+                # NaN propagates, as with np.minimum / np.maximum
+                if v < mins[m, t] or np.isnan(v):
+                    mins[m, t] = v
+                if v > maxs[m, t] or np.isnan(v):
+                    maxs[m, t] = v
+        return sums / counts, mins, maxs
+    
+    return aggregate
+
+
+def _aggregate_by_turn(question_metrics: Dict[str, np.ndarray],
+                       n_turns: int) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Calculate the average, min and max of each metric per turn.
+    
+    Every history starts at turn 0 and only advances one turn at a time, so each
+    turn below n_turns has at least one question. Large inputs use a numba kernel
+    when it is installed; the results are identical.
+    
+    Args:
+        question_metrics: Flat per-question arrays from process_question_history
+        n_turns: Number of turns (highest turn index + 1)
+        
+    Returns:
+        Tuple of (avg_metrics, min_metrics, max_metrics), each mapping a metric
+        name to an array of length n_turns
+    """
+    question_turns = question_metrics["turn"]
+    
+    kernel = _aggregate_by_turn_kernel() if question_turns.size >= _NUMBA_MIN_QUESTIONS else None
+    if kernel is not None:
+        values = np.stack([question_metrics[metric] for metric in _TURN_METRICS])
+        avgs, mins, maxs = kernel(question_turns, values, n_turns)
+        return (dict(zip(_TURN_METRICS, avgs)), dict(zip(_TURN_METRICS, mins)),
+                dict(zip(_TURN_METRICS, maxs)))
+    
+    counts = np.bincount(question_turns, minlength=n_turns)
+    order = np.argsort(question_turns, kind='stable')
+    turn_starts = np.flatnonzero(np.diff(question_turns[order], prepend=-1))
+    
+    avg_metrics = {}
+    min_metrics = {}
+    max_metrics = {}
+    
+    for metric in _TURN_METRICS:
+        values = question_metrics[metric]
+        sorted_values = values[order]
+        avg_metrics[metric] = np.bincount(question_turns, weights=values,
+                                          minlength=n_turns) / counts
+        min_metrics[metric] = np.minimum.reduceat(sorted_values, turn_starts)
+        max_metrics[metric] = np.maximum.reduceat(sorted_values, turn_starts)
+    
+    return avg_metrics, min_metrics, max_metrics
 
 
 class ResultsVisualizer:
     """Class for visualizing simulation results from the agentic disambiguation system."""
     
-    def __init__(self, results_dir: str):
+    def __init__(self, results_dir: str, skip_up_to_date: bool = False,
+                 results: Optional[List[Dict[str, Any]]] = None):
         """
         Initialize a results visualizer.
         
         Args:
             results_dir: Directory containing simulation result files
+            skip_up_to_date: Don't redraw a visualization whose saved file was
+                recorded from the same result files and is newer than all of them
+            results: Already loaded results to use instead of reading
+                results_dir (optional)
         """
         self.results_dir = results_dir
         self.results = []
-        self.load_results()
+        self.skip_up_to_date = skip_up_to_date
+        
+        # Newest modification time among the result files and a fingerprint of
+        # which files they are; both None if results weren't read from files
+        self._results_mtime = None
+        self._results_fingerprint = None
+        
+        # process_question_history output, tagged with the results list it was
+        # built from and that list's length
+        self._processed = None
+        self._processed_results = None
+        self._processed_len = 0
+        
+        if results is None:
+            self.load_results()
+        else:
+            self.results = results
         
         # Set up color palette
         self.colors = {
@@ -40,34 +272,124 @@ class ResultsVisualizer:
         # Use Seaborn styling
         sns.set_style("whitegrid")
         
+        # Resolve and load the default font up front, so every plot (and any
+        # visualize_all worker forked from this process) finds it cached
+        font_manager.get_font(font_manager.findfont(font_manager.FontProperties()))
+        
     def load_results(self) -> None:
-        """Load all result files from the results directory."""
+        """Load all result files from the results directory, keeping only _RESULT_KEYS of each."""
         # Find all JSON files in the results directory
         result_files = glob.glob(os.path.join(self.results_dir, "*.json"))
-        
-        for file_path in result_files:
-            try:
-                with open(file_path, 'r') as f:
-                    result = json.load(f)
-                    self.results.append(result)
-            except Exception as e:
-                print(f"Error loading {file_path}: {e}")
+        self._results_mtime = max((os.path.getmtime(f) for f in result_files), default=None)
+        if result_files:
+            listing = "\n".join(sorted(os.path.abspath(f) for f in result_files))
+            self._results_fingerprint = hashlib.sha1(listing.encode()).hexdigest()
+        
+        # Read and parse files concurrently; results keep the glob order
+        with ThreadPoolExecutor(max_workers=max(1, min(32, len(result_files)))) as executor:
+            futures = [executor.submit(_load_result, file_path) for file_path in result_files]
+            for file_path, future in zip(result_files, futures):
+                try:
+                    self.results.append(future.result())
+                except Exception as e:
+                    print(f"Error loading {file_path}: {e}")
                 
         print(f"Loaded {len(self.results)} simulation results")
     
-    def process_question_history(self) -> Tuple[Dict, List[Dict]]:
+    def _is_up_to_date(self, save_path: Optional[str]) -> bool:
+        """
+        Check whether a visualization can be skipped because save_path already
+        exists, was recorded as drawn from the same set of result files, and is
+        newer than every one of them.
+        
+        Args:
+            save_path: Path the visualization would be saved to (optional)
+            
+        Returns:
+            True if skip_up_to_date is set and the saved file is up to date
+        """
+        if not save_path or not self.skip_up_to_date or self._results_fingerprint is None:
+            return False
+        
+        # A result file deleted since the file was saved changes the fingerprint
+        manifest = self._read_outputs_manifest(os.path.dirname(save_path))
+        if manifest.get(os.path.basename(save_path)) != self._results_fingerprint:
+            return False
+        
+        try:
+            up_to_date = os.path.getmtime(save_path) > self._results_mtime
+        except OSError:
+            return False
+        
+        if up_to_date:
+            print(f"{save_path} is up to date, skipping")
+        return up_to_date
+    
+    def _read_outputs_manifest(self, output_dir: str) -> Dict[str, str]:
+        """Read output_dir's _OUTPUTS_MANIFEST, or an empty dict if it is missing or unreadable."""
+        try:
+            manifest = read_json(os.path.join(output_dir, _OUTPUTS_MANIFEST))
+        except (OSError, ValueError):
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+    
+    def _record_outputs(self, save_paths: List[str]) -> None:
+        """
+        Record in each output directory's manifest which result files the
+        visualizations at save_paths were just drawn from.
+        
+        Args:
+            save_paths: Paths of the saved visualizations
+        """
+        if self._results_fingerprint is None:
+            return
+        
+        names_by_dir = defaultdict(list)
+        for save_path in save_paths:
+            names_by_dir[os.path.dirname(save_path)].append(os.path.basename(save_path))
+        
+        for output_dir, names in names_by_dir.items():
+            manifest = self._read_outputs_manifest(output_dir)
+            manifest.update(dict.fromkeys(names, self._results_fingerprint))
+            save_json(manifest, os.path.join(output_dir, _OUTPUTS_MANIFEST))
+    
+    def process_question_history(self) -> Tuple[Dict[str, np.ndarray], List[Dict]]:
         """
         Process question history data from all results.
         
+        The output is cached and rebuilt only when self.results is replaced or
+        changes length, so several visualizations share one scan.
+        
         Returns:
-            Tuple of (metrics_by_turn, all_question_data)
+            Tuple of (question_metrics, all_question_data), where question_metrics
+            maps 'simulation' (index into self.results), 'turn', 'evpi',
+            'regret_reduction', 'ucb_score' and 'certainty' to flat arrays with
+            one entry per question, in the same order as all_question_data
         """
-        all_question_data = []
-        metrics_by_turn = defaultdict(lambda: defaultdict(list))
+        if (self._processed is not None and self._processed_results is self.results
+                and self._processed_len == len(self.results)):
+            return self._processed
         
-        for result in self.results:
-            history = result.get("question_history", [])
-            
+        all_question_data = []
+        histories = [result.get("question_history") or () for result in self.results]
+        n_questions = sum(len(history) for history in histories)
+        question_metrics = {
+            "simulation": np.repeat(np.arange(len(histories), dtype=np.int32),
+                                    [len(history) for history in histories]),
+            "turn": np.empty(n_questions, dtype=np.int32),
+            "evpi": np.empty(n_questions, dtype=np.float64),
+            "regret_reduction": np.empty(n_questions, dtype=np.float64),
+            "ucb_score": np.empty(n_questions, dtype=np.float64),
+            "certainty": np.empty(n_questions, dtype=np.float64),
+        }
+        turn_arr = question_metrics["turn"]
+        evpi_arr = question_metrics["evpi"]
+        regret_arr = question_metrics["regret_reduction"]
+        ucb_arr = question_metrics["ucb_score"]
+        certainty_arr = question_metrics["certainty"]
+        
+        idx = 0
+        for history in histories:
             # Group questions by turn - assuming q_0 resets each turn
             turn_idx = 0
             last_q_id = None
@@ -79,20 +401,25 @@ class ResultsVisualizer:
                 if q_id.startswith("q_0") and last_q_id is not None and not last_q_id.startswith("q_0"):
                     turn_idx += 1
                 
-                # Store metrics for this turn
-                metrics = q_data.get("metrics", {})
-                metrics_by_turn[turn_idx]["evpi"].append(metrics.get("evpi", 0))
-                metrics_by_turn[turn_idx]["regret_reduction"].append(metrics.get("regret_reduction", 0))
-                metrics_by_turn[turn_idx]["ucb_score"].append(metrics.get("ucb_score", 0))
-                metrics_by_turn[turn_idx]["certainty"].append(q_data.get("overall_certainty", 0))
+                # Store metrics for this question
+                metrics = q_data.get("metrics") or _EMPTY
+                turn_arr[idx] = turn_idx
+                evpi_arr[idx] = metrics.get("evpi", 0)
+                regret_arr[idx] = metrics.get("regret_reduction", 0)
+                ucb_arr[idx] = metrics.get("ucb_score", 0)
+                certainty_arr[idx] = q_data.get("overall_certainty", 0)
+                idx += 1
                 
                 # Store the question data with its turn
                 q_data["turn"] = turn_idx
                 all_question_data.append(q_data)
                 
                 last_q_id = q_id
-                
-        return metrics_by_turn, all_question_data
+        
+        self._processed = (question_metrics, all_question_data)
+        self._processed_results = self.results
+        self._processed_len = len(self.results)
+        return self._processed
     
     def calculate_threshold(self, turn: int, total_clarifications: int, base_threshold: float = 1.5, alpha: float = 0.25) -> float:
         """
@@ -111,89 +438,59 @@ class ResultsVisualizer:
         # tau = tau_0 * (1.0 + alpha * N)
         return base_threshold + alpha * total_clarifications
     
-    def visualize_metrics_over_turns(self, save_path: Optional[str] = None) -> None:
+    def visualize_metrics_over_turns(self, save_path: Optional[str] = None, fig: Optional[Figure] = None) -> None:
         """
         Create an enhanced visualization of metrics evolving over turns.
         
         Args:
             save_path: Path to save the visualization (optional)
+            fig: Figure to clear and draw into instead of creating one (optional)
         """
-        metrics_by_turn, all_questions = self.process_question_history()
-        
-        if not metrics_by_turn:
-            print("No metrics data available for visualization")
+        if self._is_up_to_date(save_path):
             return
         
-        # Set pure white background
-        plt.style.use('default')
-        plt.rcParams['figure.facecolor'] = 'white'
-        plt.rcParams['axes.facecolor'] = 'white'
-        plt.rcParams['savefig.facecolor'] = 'white'
+        question_metrics, all_questions = self.process_question_history()
         
-        # Set up the figure with explicit background
-        fig, ax = plt.subplots(figsize=(14, 10), facecolor='white')
-        ax.set_facecolor('white')
-        
-        # Get total clarifications per turn
-        total_clarifications_by_turn = {}
-        current_total = 0
+        if question_metrics["turn"].size == 0:
+            print("No metrics data available for visualization")
+            return
         
-        for turn in sorted(metrics_by_turn.keys()):
-            # Each turn represents one clarification question asked
-            current_total += 1
-            total_clarifications_by_turn[turn] = current_total
+        # Set pure white background, for this plot only so the style doesn't
+        # depend on which visualizations ran before it in the same process
+        with plt.style.context('default'), plt.rc_context({'figure.facecolor': 'white',
+                                                           'axes.facecolor': 'white',
+                                                           'savefig.facecolor': 'white'}):
+            self._draw_metrics_over_turns(question_metrics, save_path, fig)
+    
+    def _draw_metrics_over_turns(self, question_metrics: Dict[str, np.ndarray],
+                                 save_path: Optional[str], fig: Optional[Figure] = None) -> None:
+        """
+        Draw visualize_metrics_over_turns' plot.
         
-        max_turn = max(metrics_by_turn.keys())
-        turns = list(range(max_turn + 1))
+        Args:
+            question_metrics: Per-question metric arrays from process_question_history
+            save_path: Path to save the visualization (optional)
+            fig: Figure to clear and draw into instead of creating one (optional)
+        """
+        max_turn = int(question_metrics["turn"].max())
+        turns = np.arange(max_turn + 1)
         
         # Calculate average, min, max for each metric per turn
-        avg_metrics = {
-            'evpi': [],
-            'regret_reduction': [],
-            'ucb_score': [],
-            'certainty': []
-        }
-        
-        min_metrics = {
-            'evpi': [],
-            'regret_reduction': [],
-            'ucb_score': [],
-            'certainty': []
-        }
-        
-        max_metrics = {
-            'evpi': [],
-            'regret_reduction': [],
-            'ucb_score': [],
-            'certainty': []
-        }
-        
-        # For each turn, calculate the metrics
-        for turn in turns:
-            for metric in avg_metrics.keys():
-                values = metrics_by_turn[turn][metric]
-                if values:
-                    avg_metrics[metric].append(np.mean(values))
-                    min_metrics[metric].append(np.min(values))
-                    max_metrics[metric].append(np.max(values))
-                else:
-                    avg_metrics[metric].append(0)
-                    min_metrics[metric].append(0)
-                    max_metrics[metric].append(0)
+        avg_metrics, min_metrics, max_metrics = _aggregate_by_turn(question_metrics, max_turn + 1)
         
         # Create 1-based indexing for question numbers
-        question_numbers = [t + 1 for t in turns]
+        question_numbers = turns + 1
         
         # Calculate threshold for each turn based on total clarifications
-        # Using base threshold of 1.5 with increment of 0.2
-        thresholds = [1.6 + 0.25 * i for i in range(len(turns))]
+        # (one clarification question per turn), in closed form over all turns
+        thresholds = 1.6 + 0.25 * turns
         
         # Determine y-axis scale
         y_max = max(
-            max(max_metrics['evpi']), 
-            max(max_metrics['regret_reduction']), 
-            max(max_metrics['ucb_score']), 
-            max(thresholds)
+            max_metrics['evpi'].max(), 
+            max_metrics['regret_reduction'].max(), 
+            max_metrics['ucb_score'].max(), 
+            thresholds.max()
         ) * 1.1  # Add 10% padding
         
         # Update colors for better contrast on white background
@@ -206,13 +503,15 @@ class ResultsVisualizer:
         }
         
         # Set up the figure with explicit background
-        fig, ax = plt.subplots(figsize=(14, 10), facecolor='white')
+        _start_figure(fig, (14, 10), facecolor='white')
+        ax = plt.gca()
         ax.set_facecolor('white')
         
         # Add subtle grid for readability
         plt.grid(True, linestyle='--', alpha=0.7, color='#dddddd')
         
-        # Plot data with enhanced styling
+        # Plot data with enhanced styling; the filled ranges and crossing markers
+        # are rasterized so vector output stays small, lines and text stay vector
         for metric in ['evpi', 'regret_reduction', 'ucb_score']:
             # Plot average line
             plt.plot(question_numbers, avg_metrics[metric], marker='o', 
@@ -221,30 +520,33 @@ class ResultsVisualizer:
             
             # Plot min/max range
             plt.fill_between(question_numbers, min_metrics[metric], max_metrics[metric],
-                            alpha=0.2, color=self.colors[metric], label=f'Min/Max {metric.replace("_", " ").title()}')
+                            alpha=0.2, color=self.colors[metric], label=f'Min/Max {metric.replace("_", " ").title()}',
+                            rasterized=True)
         
         # Plot threshold line
         threshold_line = plt.plot(question_numbers, thresholds, '--', color=self.colors['threshold'], 
                                 linewidth=2.5, label='Dynamic Threshold')
         
-        # Add annotations for threshold crossings
-        crossing_added_to_legend = False
-        for t, q_num in zip(turns, question_numbers):
-            if max_metrics['ucb_score'][t] >= thresholds[t]:
-                # Highlight crossings with star
-                plt.scatter([q_num], [max_metrics['ucb_score'][t]], s=200,
-                        marker='*', color='gold', edgecolor='black', zorder=10,
-                        label='Threshold Crossed' if not crossing_added_to_legend else "")
-                crossing_added_to_legend = True
-                
-                # Add annotation for the first few crossings
-                  # Limit annotations to avoid clutter
-                plt.annotate(f"Question Selected\nUCB: {max_metrics['ucb_score'][t]:.2f}\nThreshold: {thresholds[t]:.2f}",
-             xy=(q_num, max_metrics['ucb_score'][t]), 
-             xytext=(q_num, max_metrics['ucb_score'][t] + y_max*0.05),  # Position below the point
-             arrowprops=dict(facecolor='black', shrink=0.05, width=1.5, headwidth=8),
+        # Highlight all threshold crossings with stars in a single artist
+        crossed = np.flatnonzero(max_metrics['ucb_score'] >= thresholds)
+        if crossed.size:
+            plt.scatter(question_numbers[crossed], max_metrics['ucb_score'][crossed], s=200,
+                    marker='*', color='gold', edgecolor='black', zorder=10,
+                    label='Threshold Crossed', rasterized=True)
+        
+        # Add annotations for threshold crossings, sharing one set of style
+        # dicts (matplotlib copies what it modifies)
+        arrow_style = dict(facecolor='black', shrink=0.05, width=1.5, headwidth=8)
+        box_style = dict(boxstyle="round,pad=0.3", fc="white", ec="gray", alpha=0.8)
+        for t in crossed:
+            q_num = question_numbers[t]
+            ucb = max_metrics['ucb_score'][t]
+            ax.annotate(f"Question Selected\nUCB: {ucb:.2f}\nThreshold: {thresholds[t]:.2f}",
+             xy=(q_num, ucb), 
+             xytext=(q_num, ucb + y_max*0.05),  # Position below the point
+             arrowprops=arrow_style,
              fontsize=10, 
-             bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="gray", alpha=0.8),
+             bbox=box_style,
              ha='center')  # Center horizontally
         
         # UI enhancements
@@ -293,56 +595,64 @@ class ResultsVisualizer:
         
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"Visualization saved to {save_path}")
-        else:
-            plt.show()
-    def visualize_question_metrics(self, save_path: Optional[str] = None) -> None:
+        _save_or_show(save_path, keep_open=fig is not None)
+    def visualize_question_metrics(self, save_path: Optional[str] = None, fig: Optional[Figure] = None) -> None:
         """
         Create visualization of question metrics by type of argument targeted.
         
         Args:
             save_path: Path to save the visualization (optional)
+            fig: Figure to clear and draw into instead of creating one (optional)
         """
+        if self._is_up_to_date(save_path):
+            return
+        
         _, all_questions = self.process_question_history()
         
         if not all_questions:
             print("No question data available for visualization")
             return
         
-        # Group questions by their target arguments
-        arg_metrics = defaultdict(lambda: defaultdict(list))
+        # One row per (question, targeted argument): the argument's id in
+        # arg_ids (first-seen order) and the question's metrics
+        arg_ids = {}
+        arg_col = []
+        value_rows = []
         
         for q in all_questions:
-            target_args = q.get("target_args", [])
-            metrics = q.get("metrics", {})
+            target_args = q.get("target_args") or ()
+            metrics = q.get("metrics") or _EMPTY
             
             for tool_arg in target_args:
                 if len(tool_arg) == 2:
                     tool, arg = tool_arg
                     key = f"{tool}.{arg}"
                     
-                    arg_metrics[key]["evpi"].append(metrics.get("evpi", 0))
-                    arg_metrics[key]["regret_reduction"].append(metrics.get("regret_reduction", 0))
-                    arg_metrics[key]["ucb_score"].append(metrics.get("ucb_score", 0))
-        
-        # Create dataframe for visualization
-        df_data = []
-        
-        for arg, metrics in arg_metrics.items():
-            for metric_name, values in metrics.items():
-                for value in values:
-                    df_data.append({
-                        "Argument": arg,
-                        "Metric": metric_name,
-                        "Value": value
-                    })
-        
-        df = pd.DataFrame(df_data)
+                    arg_col.append(arg_ids.setdefault(key, len(arg_ids)))
+                    value_rows.append((metrics.get("evpi", 0),
+                                       metrics.get("regret_reduction", 0),
+                                       metrics.get("ucb_score", 0)))
+        
+        arg_codes = np.asarray(arg_col, dtype=np.intp)
+        values = np.asarray(value_rows, dtype=float).reshape(-1, len(_QUESTION_METRICS))
+        
+        # Long format grouped by argument, then metric, with categorical grouping
+        # columns built from the codes so seaborn's per-box grouping stays cheap
+        per_arg = np.bincount(arg_codes, minlength=len(arg_ids))
+        blocks = np.split(values[np.argsort(arg_codes, kind='stable')], np.cumsum(per_arg)[:-1])
+        n_metrics = len(_QUESTION_METRICS)
+        
+        df = pd.DataFrame({
+            "Argument": pd.Categorical.from_codes(np.repeat(np.arange(len(arg_ids)), n_metrics * per_arg),
+                                                  categories=list(arg_ids)),
+            "Metric": pd.Categorical.from_codes(np.repeat(np.tile(np.arange(n_metrics), len(arg_ids)),
+                                                          np.repeat(per_arg, n_metrics)),
+                                                categories=list(_QUESTION_METRICS)),
+            "Value": np.concatenate([block.T.ravel() for block in blocks])
+        })
         
         # Create visualization
-        plt.figure(figsize=(14, 8))
+        _start_figure(fig, (14, 8))
         
         # Use categorical plot from seaborn
         sns.boxplot(data=df, x="Argument", y="Value", hue="Metric")
@@ -356,24 +666,24 @@ class ResultsVisualizer:
         
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"Visualization saved to {save_path}")
-        else:
-            plt.show()
+        _save_or_show(save_path, keep_open=fig is not None)
     
-    def visualize_arg_importance(self, save_path: Optional[str] = None) -> None:
+    def visualize_arg_importance(self, save_path: Optional[str] = None, fig: Optional[Figure] = None) -> None:
         """
         Visualize the argument importance and clarification counts.
         
         Args:
             save_path: Path to save the visualization (optional)
+            fig: Figure to clear and draw into instead of creating one (optional)
         """
+        if self._is_up_to_date(save_path):
+            return
+        
         # Get clarification counts from all results
         arg_counts = defaultdict(int)
         
         for result in self.results:
-            counts = result.get("arg_clarification_counts", {})
+            counts = result.get("arg_clarification_counts") or _EMPTY
             for arg, count in counts.items():
                 arg_counts[arg] += count
         
@@ -386,9 +696,9 @@ class ResultsVisualizer:
         args = [x[0] for x in sorted_args]
         counts = [x[1] for x in sorted_args]
         
-        plt.figure(figsize=(12, 6))
+        _start_figure(fig, (12, 6))
         
-        bars = plt.barh(args, counts, color=sns.color_palette("viridis", len(args)))
+        bars = plt.barh(args, counts, color=_viridis_palette(len(args)))
         
         plt.title("Argument Clarification Counts", fontsize=16)
         plt.xlabel("Number of Clarifications", fontsize=12)
@@ -401,49 +711,47 @@ class ResultsVisualizer:
         plt.grid(True, axis='x', linestyle='--', alpha=0.7)
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"Visualization saved to {save_path}")
-        else:
-            plt.show()
+        _save_or_show(save_path, keep_open=fig is not None)
     
-    def visualize_success_metrics(self, save_path: Optional[str] = None) -> None:
+    def visualize_success_metrics(self, save_path: Optional[str] = None, fig: Optional[Figure] = None) -> None:
         """
         Visualize success metrics across all simulations.
         
         Args:
             save_path: Path to save the visualization (optional)
+            fig: Figure to clear and draw into instead of creating one (optional)
         """
+        if self._is_up_to_date(save_path):
+            return
+        
         if not self.results:
             print("No results available for visualization")
             return
         
+        metric_names = ["Validity Rate", "Tool Match Rate", "Parameter Match Rate", "Success"]
         data = []
         
         for result in self.results:
-            eval_data = result.get("evaluation", {})
+            eval_data = result.get("evaluation") or _EMPTY
+            correctness = eval_data.get("correctness") or _EMPTY
             
-            # Extract metrics
-            metrics = {
-                "Validity Rate": eval_data.get("validity", {}).get("validity_rate", 0),
-                "Tool Match Rate": eval_data.get("correctness", {}).get("tool_match_rate", 0),
-                "Parameter Match Rate": eval_data.get("correctness", {}).get("param_match_rate", 0),
-                "Success": 1 if result.get("success", False) else 0
-            }
-            
-            # Add to data list
-            data.append(metrics)
+            # Extract metrics, in metric_names order
+            data.append((
+                (eval_data.get("validity") or _EMPTY).get("validity_rate", 0),
+                correctness.get("tool_match_rate", 0),
+                correctness.get("param_match_rate", 0),
+                1 if result.get("success", False) else 0
+            ))
         
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
+        # Average each metric over the simulations, skipping missing (null) values
+        avg_metrics = np.nanmean(np.asarray(data, dtype=float), axis=0)
         
         # Create visualization
-        plt.figure(figsize=(10, 6))
+        _start_figure(fig, (10, 6))
         
         # Create a bar chart of average success metrics
-        avg_metrics = df.mean()
-        bars = plt.bar(avg_metrics.index, avg_metrics.values, 
-                      color=sns.color_palette("viridis", len(avg_metrics)))
+        bars = plt.bar(metric_names, avg_metrics, 
+                      color=_viridis_palette(len(metric_names)))
         
         plt.title("Average Success Metrics Across Simulations", fontsize=16)
         plt.ylabel("Rate (0-1)", fontsize=12)
@@ -458,19 +766,19 @@ class ResultsVisualizer:
         plt.grid(True, axis='y', linestyle='--', alpha=0.7)
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"Visualization saved to {save_path}")
-        else:
-            plt.show()
+        _save_or_show(save_path, keep_open=fig is not None)
     
-    def visualize_turns_vs_success(self, save_path: Optional[str] = None) -> None:
+    def visualize_turns_vs_success(self, save_path: Optional[str] = None, fig: Optional[Figure] = None) -> None:
         """
         Visualize relationship between number of turns and success.
         
         Args:
             save_path: Path to save the visualization (optional)
+            fig: Figure to clear and draw into instead of creating one (optional)
         """
+        if self._is_up_to_date(save_path):
+            return
+        
         if not self.results:
             print("No results available for visualization")
             return
@@ -486,97 +794,110 @@ class ResultsVisualizer:
             turns_data.append(turns)
             success_data.append(1 if success else 0)
         
-        # Create scatterplot
-        plt.figure(figsize=(10, 6))
+        turns_arr = np.asarray(turns_data, dtype=int)
+        success_arr = np.asarray(success_data)
         
-        # Jitter the success values slightly to show overlapping points
-        jittered_success = [s + np.random.normal(0, 0.05) for s in success_data]
+        _start_figure(fig, (10, 6))
+        ax = plt.gca()
+        # Only this plot needs axes_grid1, so it is imported here
+        from mpl_toolkits.axes_grid1 import make_axes_locatable
+        divider = make_axes_locatable(ax)
         
-        plt.scatter(turns_data, jittered_success, alpha=0.7, s=100, 
-                   c=success_data, cmap='viridis')
+        if len(turns_arr) >= _DENSITY_PLOT_MIN_POINTS:
+            # Too many points to scatter: count simulations per (turns, outcome)
+            # cell and draw them as a single mesh
+            turn_edges = np.arange(turns_arr.min(), turns_arr.max() + 2) - 0.5
+            _, _, _, mesh = ax.hist2d(turns_arr, success_arr, bins=[turn_edges, [-0.5, 0.5, 1.5]],
+                                      cmap='viridis', cmin=1)
+            cax = divider.append_axes("right", size="3%", pad=0.1)
+            plt.colorbar(mesh, cax=cax, label="Simulations")
+            plt.sca(ax)
+        else:
+            # Create scatterplot
+            # Jitter the success values slightly to show overlapping points, drawing
+            # all offsets at once from a seeded generator so reruns look the same
+            rng = np.random.default_rng(0)
+            jittered_success = success_arr + rng.normal(0, 0.05, size=len(success_arr))
+            
+            plt.scatter(turns_arr, jittered_success, alpha=0.7, s=100, 
+                       c=success_arr, cmap='viridis', rasterized=True)
         
-        plt.title("Relationship Between Turns and Success", fontsize=16)
+        # Figure-level title, since the histogram axes sit on top of the plot
+        plt.suptitle("Relationship Between Turns and Success", fontsize=16)
         plt.xlabel("Number of Turns", fontsize=12)
         plt.ylabel("Success (0=Failed, 1=Succeeded)", fontsize=12)
         plt.yticks([0, 1], ["Failed", "Succeeded"])
         plt.grid(True, linestyle='--', alpha=0.7)
         
         # Use integer ticks for x-axis
-        ax = plt.gca()
         ax.xaxis.set_major_locator(MaxNLocator(integer=True))
         
-        # Add turn distribution as a histogram above the main plot
-        divider = make_axes_locatable(ax)
+        # Add turn distribution as a histogram above the main plot, one bar per turn count
+        turn_counts = np.bincount(turns_arr - turns_arr.min())
         ax_hist = divider.append_axes("top", 1.2, pad=0.1, sharex=ax)
-        ax_hist.hist(turns_data, bins=max(turns_data), color='skyblue', alpha=0.7)
+        ax_hist.bar(np.arange(turns_arr.min(), turns_arr.max() + 1), turn_counts,
+                    width=1.0, color='skyblue', alpha=0.7)
         ax_hist.set_title("Distribution of Turns", fontsize=12)
         ax_hist.set_ylabel("Count", fontsize=10)
+        ax_hist.tick_params(labelbottom=False)
         ax_hist.grid(True, linestyle='--', alpha=0.7)
         
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"Visualization saved to {save_path}")
-        else:
-            plt.show()
+        _save_or_show(save_path, keep_open=fig is not None)
     
-    def visualize_question_effectiveness(self, save_path: Optional[str] = None) -> None:
+    def visualize_question_effectiveness(self, save_path: Optional[str] = None, fig: Optional[Figure] = None) -> None:
         """
         Visualize how questions affect certainty.
         
         Args:
             save_path: Path to save the visualization (optional)
+            fig: Figure to clear and draw into instead of creating one (optional)
         """
-        certainty_changes = []
+        if self._is_up_to_date(save_path):
+            return
         
-        for result in self.results:
-            history = result.get("question_history", [])
+        question_metrics, all_questions = self.process_question_history()
+        simulation = question_metrics["simulation"]
+        
+        targets = []
+        kept = []
+        
+        # Every question followed by another one from the same simulation
+        for i in np.flatnonzero(simulation[1:] == simulation[:-1]):
+            q = all_questions[i]
+            target_args = q.get("target_args", [])
             
-            for i in range(1, len(history)):
-                prev_certainty = history[i-1].get("overall_certainty", 0)
-                curr_certainty = history[i].get("overall_certainty", 0)
-                
-                # Calculate change in certainty
-                change = curr_certainty - prev_certainty
-                
-                # Get question details
-                question = history[i-1].get("question_text", "")
-                targets = history[i-1].get("target_args", [])
-                
-                if targets:
-                    target_args = [f"{t[0]}.{t[1]}" for t in targets if len(t) == 2]
-                    target_str = ", ".join(target_args)
-                else:
-                    target_str = "Unknown"
-                
-                # Only include if there's a question and targets
-                if question and target_str != "Unknown":
-                    certainty_changes.append({
-                        "Question": question[:50] + "..." if len(question) > 50 else question,
-                        "Target": target_str,
-                        "Certainty Change": change
-                    })
-        
-        if not certainty_changes:
+            # Only include if there's a question and targets
+            if q.get("question_text", "") and target_args:
+                targets.append(", ".join(f"{t[0]}.{t[1]}" for t in target_args if len(t) == 2))
+                kept.append(i)
+        
+        if not targets:
             print("No question effectiveness data available")
             return
         
-        # Convert to DataFrame
-        df = pd.DataFrame(certainty_changes)
+        # Change in certainty after each kept question
+        certainty_changes = np.diff(question_metrics["certainty"])[kept]
+        
+        # Group by target argument (sorted, as a groupby would) and calculate the
+        # average certainty change
+        target_names, target_ids = np.unique(targets, return_inverse=True)
+        counts = np.bincount(target_ids)
+        means = np.bincount(target_ids, weights=certainty_changes) / counts
         
-        # Group by target argument and calculate average certainty change
-        grouped = df.groupby("Target")["Certainty Change"].agg(['mean', 'count']).reset_index()
-        grouped = grouped.sort_values('mean', ascending=False)
+        # Highest average first; ties keep the order pandas' descending sort gives
+        order = (len(means) - 1 - np.argsort(means[::-1], kind='quicksort'))[::-1]
+        target_names, counts, means = target_names[order], counts[order], means[order]
         
-        plt.figure(figsize=(12, 8))
+        _start_figure(fig, (12, 8))
         
-        bars = plt.barh(grouped["Target"], grouped["mean"], 
-                       color=sns.color_palette("viridis", len(grouped)))
+        bars = plt.barh(target_names, means, 
+                       color=_viridis_palette(len(target_names)))
         
         # Add count labels
-        for i, (_, row) in enumerate(grouped.iterrows()):
-            plt.text(max(0.001, row['mean'] + 0.01), i, f"n={int(row['count'])}", va='center')
+        for i, (mean, count) in enumerate(zip(means, counts)):
+            plt.text(max(0.001, mean + 0.01), i, f"n={count}", va='center')
         
         plt.title("Average Certainty Improvement by Target Argument", fontsize=16)
         plt.xlabel("Average Increase in Certainty", fontsize=12)
@@ -584,87 +905,102 @@ class ResultsVisualizer:
         plt.grid(True, axis='x', linestyle='--', alpha=0.7)
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"Visualization saved to {save_path}")
-        else:
-            plt.show()
+        _save_or_show(save_path, keep_open=fig is not None)
 
             
-    def visualize_certainty_progress(self, save_path: Optional[str] = None) -> None:
+    def visualize_certainty_progress(self, save_path: Optional[str] = None, fig: Optional[Figure] = None,
+                                     max_points_per_sim: int = _MAX_POINTS_PER_SIM) -> None:
         """
         Visualize how certainty increases with each clarification question.
         
         Args:
             save_path: Path to save the visualization (optional)
+            fig: Figure to clear and draw into instead of creating one (optional)
+            max_points_per_sim: Longer progressions are drawn downsampled to this
+                many points and without markers; jumps and the average still use
+                every question
         """
+        if self._is_up_to_date(save_path):
+            return
+        
         if not self.results:
             print("No results available for visualization")
             return
         
-        # Extract certainty progression from question history
-        certainty_progressions = []
+        # Certainty progressions come from the shared question scan: each
+        # simulation's questions form one contiguous run of the flat arrays
+        question_metrics, all_questions = self.process_question_history()
+        simulation = question_metrics["simulation"]
+        all_certainties = question_metrics["certainty"]
         
-        for result in self.results:
-            history = result.get("question_history", [])
-            if not history:
-                continue
-                
-            # Extract certainty values with their corresponding turn
-            progression = []
-            for i, item in enumerate(history):
-                progression.append({
-                    'turn': i,
-                    'certainty': item.get('overall_certainty', 0),
-                    'question': item.get('question_text', '')[:50] + '...' if len(item.get('question_text', '')) > 50 else item.get('question_text', '')
-                })
-            
-            certainty_progressions.append(progression)
-        
-        if not certainty_progressions:
+        if simulation.size == 0:
             print("No certainty progression data available")
             return
         
         # Create plot
-        plt.figure(figsize=(14, 8))
+        _start_figure(fig, (14, 8))
         
-        # Plot individual progressions
-        for i, progression in enumerate(certainty_progressions):
-            turns = [item['turn'] for item in progression]
-            certainties = [item['certainty'] for item in progression]
-            
-            # Use a unique color for each simulation
-            color = plt.cm.viridis(i / max(1, len(certainty_progressions) - 1))
-            
-            label = f"Simulation {i+1}" if i < 5 else None  # Limit labels to avoid clutter
-            plt.plot(turns, certainties, 'o-', color=color, alpha=0.7, linewidth=2, label=label)
+        starts = np.flatnonzero(np.r_[True, simulation[1:] != simulation[:-1]])
+        ends = np.append(starts[1:], simulation.size)
+        
+        # Use a unique color for each simulation
+        n_sims = len(starts)
+        colors = plt.cm.viridis(np.arange(n_sims) / max(1, n_sims - 1))
+        
+        ax = plt.gca()
+        
+        # One set of annotation style dicts shared by every jump label
+        arrow_style = dict(arrowstyle="->", color='black', lw=1.5)
+        box_style = dict(boxstyle="round,pad=0.3", fc="white", ec="gray", alpha=0.8)
+        
+        segments = []
+        marked = []
+        for start, end in zip(starts, ends):
+            turns = np.arange(end - start, dtype=float)
+            certainties = all_certainties[start:end]
+            if end - start > max_points_per_sim:
+                # Bound the drawing cost of very long histories
+                idx = np.linspace(0, end - start - 1, max_points_per_sim).astype(int)
+                segments.append(np.column_stack([turns[idx], certainties[idx]]))
+                marked.append(False)
+            else:
+                segments.append(np.column_stack([turns, certainties]))
+                marked.append(True)
             
             # Annotate significant jumps in certainty
-            for j in range(1, len(progression)):
-                if progression[j]['certainty'] > progression[j-1]['certainty'] * 5:  # Significant increase
-                    plt.annotate(progression[j-1]['question'],
-                                xy=(progression[j-1]['turn'], progression[j-1]['certainty']),
-                                xytext=(progression[j-1]['turn'] - 0.2, progression[j-1]['certainty'] * 3),
-                                arrowprops=dict(arrowstyle="->", color='black', lw=1.5),
-                                fontsize=8, bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="gray", alpha=0.8),
-                                ha='right', va='center')
+            for j in np.flatnonzero(certainties[1:] > certainties[:-1] * 5):
+                question = all_questions[start + j].get('question_text', '')
+                if len(question) > 50:
+                    question = question[:50] + '...'
+                ax.annotate(question,
+                            xy=(j, certainties[j]),
+                            xytext=(j - 0.2, certainties[j] * 3),
+                            arrowprops=arrow_style,
+                            fontsize=8, bbox=box_style,
+                            ha='right', va='center')
+        
+        # Plot individual progressions as one line collection plus one scatter for
+        # their markers, rasterized so vector output stays small however many
+        # simulations there are
+        ax.add_collection(LineCollection(segments, colors=colors, alpha=0.7, linewidths=2,
+                                         rasterized=True))
+        marker_sizes = [len(segment) if mark else 0 for segment, mark in zip(segments, marked)]
+        if any(marker_sizes):
+            points = np.concatenate([segment for segment, mark in zip(segments, marked) if mark])
+            ax.scatter(points[:, 0], points[:, 1], s=36, linewidths=1,
+                       c=np.repeat(colors, marker_sizes, axis=0),
+                       alpha=0.7, zorder=2, rasterized=True)
+        
+        # Legend entries for the first few simulations; limit labels to avoid clutter
+        for i in range(min(5, n_sims)):
+            plt.plot([], [], 'o-', color=colors[i], alpha=0.7, linewidth=2, label=f"Simulation {i+1}")
         
         # Calculate and plot the average progression
-        max_turns = max([len(prog) for prog in certainty_progressions])
-        avg_certainties = [0] * max_turns
-        counts = [0] * max_turns
-        
-        for progression in certainty_progressions:
-            for item in progression:
-                turn = item['turn']
-                if turn < max_turns:
-                    avg_certainties[turn] += item['certainty']
-                    counts[turn] += 1
-        
-        # Calculate averages
-        for i in range(max_turns):
-            if counts[i] > 0:
-                avg_certainties[i] /= counts[i]
+        # (position of each question within its simulation, summed in the same order)
+        positions = np.arange(simulation.size) - np.repeat(starts, ends - starts)
+        avg_certainties = (np.bincount(positions, weights=all_certainties)
+                           / np.bincount(positions))
+        max_turns = len(avg_certainties)
         
         # Plot average as a thicker line
         plt.plot(range(max_turns), avg_certainties, 'k-', linewidth=4, label='Average Certainty')
@@ -694,47 +1030,87 @@ class ResultsVisualizer:
         
         plt.tight_layout(rect=[0, 0.03, 1, 0.97])
         
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"Visualization saved to {save_path}")
-        else:
-            plt.show()
+        _save_or_show(save_path, keep_open=fig is not None)
 
     
-    def visualize_all(self, output_dir: str) -> None:
+    def visualize_all(self, output_dir: str, max_workers: Optional[int] = None,
+                      file_format: str = "png") -> None:
         """
         Generate all visualizations and save them to the output directory.
         
         Args:
             output_dir: Directory to save visualization files
+            max_workers: Number of processes drawing visualizations in parallel,
+                by default one per CPU; 1 draws them one after another in this process
+            file_format: Output format, one of _OUTPUT_FORMATS
         """
         os.makedirs(output_dir, exist_ok=True)
         
-        # Generate all visualizations
-        self.visualize_metrics_over_turns(
-            save_path=os.path.join(output_dir, "metrics_over_turns.png"))
-        
-        self.visualize_certainty_progress(
-            save_path=os.path.join(output_dir, "certainty_progress.png"))
-        
-        self.visualize_question_metrics(
-            save_path=os.path.join(output_dir, "question_metrics.png"))
-        
-        self.visualize_arg_importance(
-            save_path=os.path.join(output_dir, "arg_importance.png"))
+        # Drop up-to-date visualizations first so no worker is started for them
+        pending = [(method_name, os.path.join(output_dir, f"{file_name}.{file_format}"))
+                   for method_name, file_name in _ALL_VISUALIZATIONS]
+        pending = [(method_name, save_path) for method_name, save_path in pending
+                   if not self._is_up_to_date(save_path)]
         
-        self.visualize_success_metrics(
-            save_path=os.path.join(output_dir, "success_metrics.png"))
-        
-        self.visualize_turns_vs_success(
-            save_path=os.path.join(output_dir, "turns_vs_success.png"))
-        
-        self.visualize_question_effectiveness(
-            save_path=os.path.join(output_dir, "question_effectiveness.png"))
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
         
+        if max_workers <= 1 or len(pending) <= 1:
+            # Draw every visualization into one figure, cleared in between
+            fig = plt.figure()
+            try:
+                for method_name, save_path in pending:
+                    getattr(self, method_name)(save_path=save_path, fig=fig)
+            finally:
+                plt.close(fig)
+        else:
+            # pyplot figures can't be drawn from several threads, so each
+            # visualization gets a process; the results are pickled once here
+            # instead of once per task
+            payload = pickle.dumps(self.results, protocol=pickle.HIGHEST_PROTOCOL)
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+                futures = [executor.submit(_render_visualization, payload, self.results_dir,
+                                           method_name, save_path)
+                           for method_name, save_path in pending]
+                for future in futures:
+                    future.result()
+        
+        self._record_outputs([save_path for _, save_path in pending])
         print(f"All visualizations saved to {output_dir}")
 
 
+# Per worker process: the payload the cached visualizer was built from, the
+# visualizer, and the figure every task of the process draws into
+_worker_state = {"payload": None, "visualizer": None, "figure": None}
+
+
+def _render_visualization(results_payload: bytes, results_dir: str,
+                          method_name: str, save_path: str) -> None:
+    """
+    Draw and save one visualization in a visualize_all worker process.
+    
+    A worker that runs several tasks for the same results keeps its
+    ResultsVisualizer (and so its processed question data) and one figure,
+    cleared between visualizations.
+    
+    Args:
+        results_payload: Pickled results of the parent ResultsVisualizer
+        results_dir: Directory the results were loaded from
+        method_name: Name of the ResultsVisualizer.visualize_* method to call
+        save_path: Path to save the visualization
+    """
+    # Workers only write files, never open windows
+    matplotlib.use('Agg')
+    
+    if _worker_state["payload"] != results_payload:
+        _worker_state["payload"] = results_payload
+        _worker_state["visualizer"] = ResultsVisualizer(results_dir, results=pickle.loads(results_payload))
+    if _worker_state["figure"] is None:
+        _worker_state["figure"] = plt.figure()
+    
+    getattr(_worker_state["visualizer"], method_name)(save_path=save_path, fig=_worker_state["figure"])
+
+
 def main():
     """Main entry point."""
     import argparse
@@ -745,55 +1121,36 @@ def main():
     parser.add_argument("--output_dir", type=str, default="visualization_output", 
                         help="Directory to save visualization outputs")
     parser.add_argument("--visualize", type=str, default="all",
-                        choices=["all", "metrics", "certainty", "questions", "importance", 
-                                "success", "turns", "effectiveness"],
+                        choices=["all", *_CLI_VISUALIZATIONS],
                         help="Specific visualization to generate")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate visualizations even if they are newer than the results")
+    parser.add_argument("--max_workers", type=int, default=None,
+                        help="Processes drawing visualizations in parallel with --visualize all "
+                             "(default: one per CPU)")
+    parser.add_argument("--format", type=str, default="png", choices=_OUTPUT_FORMATS,
+                        help="File format of the saved visualizations")
     
     args = parser.parse_args()
     
+    # The CLI only ever saves files, so skip interactive backend and GUI setup
+    matplotlib.use("Agg")
+    
     # Create visualizer
-    visualizer = ResultsVisualizer(args.results_dir)
+    visualizer = ResultsVisualizer(args.results_dir, skip_up_to_date=not args.force)
     
     # Generate visualizations
     if args.visualize == "all":
-        visualizer.visualize_all(args.output_dir)
-    elif args.visualize == "metrics":
-        os.makedirs(args.output_dir, exist_ok=True)
-        visualizer.visualize_metrics_over_turns(
-            save_path=os.path.join(args.output_dir, "metrics_over_turns.png"))
-    elif args.visualize == "questions":
-        os.makedirs(args.output_dir, exist_ok=True)
-        visualizer.visualize_question_metrics(
-            save_path=os.path.join(args.output_dir, "question_metrics.png"))
-    elif args.visualize == "importance":
-        os.makedirs(args.output_dir, exist_ok=True)
-        visualizer.visualize_arg_importance(
-            save_path=os.path.join(args.output_dir, "arg_importance.png"))
-    elif args.visualize == "success":
+        visualizer.visualize_all(args.output_dir, max_workers=args.max_workers,
+                                 file_format=args.format)
+    else:
         os.makedirs(args.output_dir, exist_ok=True)
-        visualizer.visualize_success_metrics(
-            save_path=os.path.join(args.output_dir, "success_metrics.png"))
-    elif args.visualize == "turns":
-        os.makedirs(args.output_dir, exist_ok=True)
-        visualizer.visualize_turns_vs_success(
-            save_path=os.path.join(args.output_dir, "turns_vs_success.png"))
-    elif args.visualize == "effectiveness":
-        os.makedirs(args.output_dir, exist_ok=True)
-        visualizer.visualize_question_effectiveness(
-            save_path=os.path.join(args.output_dir, "question_effectiveness.png"))
-    elif args.visualize == "certainty":
-        os.makedirs(args.output_dir, exist_ok=True)
-        visualizer.visualize_certainty_progress(save_path=os.path.join(args.output_dir, "certainty_progress.png"))    
-            
-    
+        method_name = _CLI_VISUALIZATIONS[args.visualize]
+        file_name = f"{_VISUALIZATION_FILE_NAMES[method_name]}.{args.format}"
+        save_path = os.path.join(args.output_dir, file_name)
+        getattr(visualizer, method_name)(save_path=save_path)
+        visualizer._record_outputs([save_path])
+
 
 if __name__ == "__main__":
-    # Ensure the mpl_toolkits import is available for the turns_vs_success visualization
-    try:
-        from mpl_toolkits.axes_grid1 import make_axes_locatable
-    except ImportError:
-        def make_axes_locatable(ax):
-            raise ImportError("mpl_toolkits.axes_grid1 is required for the turns visualization. "
-                             "Please install it using 'pip install matplotlib'.")
-    
-    main()
\ No newline at end of file
+    main()